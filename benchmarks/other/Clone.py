@@ -0,0 +1,65 @@
+import time
+
+from pythonpp import *
+
+
+@PythonPP
+class NewTest:
+    def namespace(public, private):
+
+        @constructor
+        def NewTest(name, level):
+            public.publicvar = 1
+            private.name = name
+            private.level = level
+
+        @method(public)
+        def get_name():
+            return private.name
+
+        @method(public)
+        def get_level():
+            return private.level
+
+        @method(public)
+        def set_name(new_name):
+            private.name = new_name
+
+        @method(public)
+        def set_level(new_level):
+            private.level = new_level
+
+        @method(private)
+        def top_secret():
+            return private.name * private.level * 2
+
+        @special
+        def __call__():
+            return private.top_secret()
+
+
+template = NewTest("steven", 10)
+
+
+def construct():
+    obj = NewTest("steven", 10)
+    obj.set_level(11)
+
+
+def copy():
+    obj = clone(template)
+    obj.set_level(11)
+
+
+def copy_on_write():
+    obj = clone(template, copyOnWrite=True)
+    obj.set_level(11)
+
+
+if __name__ == "__main__":
+    NUM_ITERATIONS = 100000
+    for benchmark in (construct, copy, copy_on_write):
+        beg = time.time()
+        for _ in range(NUM_ITERATIONS):
+            benchmark()
+        print(benchmark.__name__, "took", time.time() - beg, "seconds")
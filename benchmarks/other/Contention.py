@@ -0,0 +1,86 @@
+import threading
+import time
+
+from pythonpp import *
+
+NUM_THREADS = 8
+NUM_INCREMENTS = 20000
+
+
+@PythonPP
+class Counter:
+    def namespace(public, private):
+        @staticinit
+        def StaticInit():
+            private.static.hits = 0
+            private.static.misses = 0
+
+        lock = threading.Lock()
+
+        @method(public.static)
+        def unsynchronized():
+            private.static.hits += 1
+
+        @method(public.static)
+        def locked():
+            with lock:
+                private.static.hits += 1
+
+        @method(public.static)
+        def atomic():
+            atomicIncrement(private.static, "hits")
+
+        @method(public.static)
+        def reset():
+            private.static.hits = 0
+
+        @method(public.static)
+        def hits():
+            return private.static.hits
+
+        @method(public.static)
+        def snapshot():
+            return staticSnapshot(private.static)
+
+
+def contention(increment, readers=0):
+    Counter.reset()
+    done = threading.Event()
+    snapshots = []
+
+    def write():
+        for _ in range(NUM_INCREMENTS):
+            increment()
+
+    def read():
+        count = 0
+        while not done.is_set():
+            Counter.snapshot()
+            count += 1
+        snapshots.append(count)
+
+    writers = [threading.Thread(target=write) for _ in range(NUM_THREADS)]
+    others = [threading.Thread(target=read) for _ in range(readers)]
+    for thread in others:
+        thread.start()
+    beg = time.time()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.time() - beg
+    done.set()
+    for thread in others:
+        thread.join()
+    return elapsed, Counter.hits(), sum(snapshots)
+
+
+if __name__ == "__main__":
+    for increment in (Counter.unsynchronized, Counter.locked, Counter.atomic):
+        elapsed, hits, _ = contention(increment)
+        print(
+            increment.__name__, "took", elapsed, "seconds, counted",
+            hits, "of", NUM_THREADS * NUM_INCREMENTS,
+        )
+    elapsed, hits, snapshots = contention(Counter.atomic, readers=2)
+    print("atomic with readers took", elapsed, "seconds,", snapshots, "snapshots taken")
@@ -0,0 +1,58 @@
+import time
+from multiprocessing import Pool, freeze_support
+
+from pythonpp import *
+from pythonpp import Executor
+
+NUM_ITEMS = 100000
+NUM_WEIGHTS = 100000
+CHUNKSIZE = 100
+
+
+@PythonPP
+class Model:
+    def namespace(public, private):
+
+        @constructor
+        def Model(name, weights):
+            public.name = name
+            private.weights = list(weights)
+            private.bias = 1
+
+        @method(public)
+        def predict(value):
+            return private.weights[value % len(private.weights)] * value + private.bias
+
+        @method(public)
+        def set_bias(bias):
+            private.bias = bias
+
+        @special
+        def __getstate__():
+            return public.name, private.weights, private.bias
+
+        @special
+        def __setstate__(state):
+            public.name, private.weights, private.bias = state
+
+
+def predict(task):
+    model, value = task
+    return model.predict(value)
+
+
+def throughput(pool, model):
+    beg = time.time()
+    pool.map(predict, [(model, value) for value in range(NUM_ITEMS)], CHUNKSIZE)
+    model.set_bias(2)
+    pool.map(predict, [(model, value) for value in range(NUM_ITEMS)], CHUNKSIZE)
+    return 2 * NUM_ITEMS / (time.time() - beg)
+
+
+if __name__ == "__main__":
+    freeze_support()
+    model = Model("model", range(NUM_WEIGHTS))
+    with Pool() as pool:
+        print("Pool took", throughput(pool, model), "items per second")
+    with Executor(classes=[Model]) as executor:
+        print("Executor took", throughput(executor, model), "items per second")
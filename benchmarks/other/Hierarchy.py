@@ -0,0 +1,93 @@
+import time
+
+from pythonpp import *
+
+DEPTH = 10
+
+
+@interface
+class Shape:
+    def namespace(public, private):
+        @method(public, abstract=True)
+        def area():
+            pass
+
+        @method(public, abstract=True)
+        def describe():
+            pass
+
+
+def subclass(base, level, final=False):
+    @PythonPP(final=final)
+    class Level(base):
+        def namespace(public, private):
+            @constructor
+            def Level(side):
+                if level > 0:
+                    base.constructor(side)
+                private.side = side
+
+            @method(public)
+            def area():
+                return private.side * level
+
+            @method(public)
+            def describe():
+                return public.area()
+
+    return Level
+
+
+def hierarchy(final):
+    classes = [subclass(Shape, 0)]
+    for level in range(1, DEPTH):
+        classes.append(subclass(classes[-1], level, final and level == DEPTH - 1))
+    return classes
+
+
+class NativeShape:
+    def __init__(self, side):
+        self.side = side
+
+    def area(self):
+        return self.side
+
+    def describe(self):
+        return self.area()
+
+
+def native_hierarchy():
+    classes = [NativeShape]
+    for level in range(1, DEPTH):
+        classes.append(
+            type("Level", (classes[-1],), {"area": lambda self, level=level: self.side * level})
+        )
+    return classes
+
+
+def polymorphic_calls(classes, num_iterations):
+    shapes = [theClass(2) for theClass in classes]
+    beg = time.time()
+    for _ in range(num_iterations):
+        for shape in shapes:
+            shape.describe()
+    return time.time() - beg
+
+
+def leaf_calls(classes, num_iterations):
+    shape = classes[-1](2)
+    beg = time.time()
+    for _ in range(num_iterations * len(classes)):
+        shape.describe()
+    return time.time() - beg
+
+
+if __name__ == "__main__":
+    NUM_ITERATIONS = 10000
+    for name, classes in (
+        ("native", native_hierarchy()),
+        ("virtual", hierarchy(final=False)),
+        ("final", hierarchy(final=True)),
+    ):
+        print(name, "polymorphic calls took", polymorphic_calls(classes, NUM_ITERATIONS), "seconds")
+        print(name, "leaf calls took", leaf_calls(classes, NUM_ITERATIONS), "seconds")
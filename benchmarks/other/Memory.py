@@ -0,0 +1,75 @@
+import time
+import tracemalloc
+
+from pythonpp import *
+
+
+@PythonPP
+class ManyMethods:
+    def namespace(public, private):
+
+        @constructor
+        def ManyMethods(name, level):
+            private.name = name
+            private.level = level
+
+        @method(public)
+        def get_name():
+            return private.name
+
+        @method(public)
+        def get_level():
+            return private.level
+
+        @method(public)
+        def set_name(new_name):
+            private.name = new_name
+
+        @method(public)
+        def set_level(new_level):
+            private.level = new_level
+
+        def level_plus(offset):
+            def get_level_plus():
+                return private.level + offset
+
+            get_level_plus.__name__ = "get_level_plus_{offset}".format(offset=offset)
+            return get_level_plus
+
+        for offset in range(30):
+            method(public)(level_plus(offset))
+
+        @method(private)
+        def top_secret():
+            return private.name * private.level * 2
+
+        @special
+        def __call__():
+            return private.top_secret()
+
+
+def memory(num_instances):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [ManyMethods("steven", index) for index in range(num_instances)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return used
+
+
+def lookup(obj, num_iterations):
+    beg = time.time()
+    for _ in range(num_iterations):
+        obj.get_name()
+        obj.set_level(11)
+        obj.get_level_plus_29()
+    return time.time() - beg
+
+
+if __name__ == "__main__":
+    NUM_INSTANCES = 10000
+    NUM_ITERATIONS = 100000
+    used = memory(NUM_INSTANCES)
+    print(NUM_INSTANCES, "instances used", used, "bytes,", used // NUM_INSTANCES, "bytes per instance")
+    print("lookup took", lookup(ManyMethods("steven", 10), NUM_ITERATIONS), "seconds")
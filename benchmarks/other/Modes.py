@@ -0,0 +1,85 @@
+import time
+
+from pythonpp import *
+from Native import NativeTest
+
+
+def declare(checks):
+    @PythonPP(checks=checks)
+    class NewTest:
+        def namespace(public, private):
+
+            public.publicvar = 1
+
+            @constructor
+            def NewTest(name, level):
+                private.name = name
+                private.level = level
+
+            @method(public)
+            def get_name():
+                return private.name
+
+            @method(public)
+            def get_level():
+                return private.level
+
+            @method(public)
+            def set_name(new_name):
+                assert type(new_name) is str
+                private.name = new_name
+
+            @method(public)
+            def set_level(new_level):
+                assert type(new_level) is int
+                private.level = new_level
+
+            @method(private)
+            def top_secret():
+                return private.name * private.level * 2
+
+            @special
+            def __call__():
+                return private.top_secret()
+
+            @special
+            def __str__():
+                return "{name} is at level {level}".format(
+                    name=private.name,
+                    level=private.level
+                )
+
+    return NewTest
+
+
+def method_calls(theClass, num_iterations):
+    obj = theClass("steven", 10)
+    beg = time.time()
+    for _ in range(num_iterations):
+        obj.get_name()
+        obj.get_level()
+        obj.set_name("Steven")
+        obj.set_level(11)
+        obj.get_name()
+        obj.get_level()
+        obj()
+        str(obj)
+    return time.time() - beg
+
+
+def constructions(theClass, num_iterations):
+    beg = time.time()
+    for _ in range(num_iterations):
+        theClass("steven", 10)
+    return time.time() - beg
+
+
+if __name__ == "__main__":
+    NUM_ITERATIONS = 100000
+    for name, theClass in (
+        ("native", NativeTest),
+        ("checked", declare(checks=True)),
+        ("production", declare(checks=False)),
+    ):
+        print(name, "method calls took", method_calls(theClass, NUM_ITERATIONS), "seconds")
+        print(name, "constructions took", constructions(theClass, NUM_ITERATIONS), "seconds")
@@ -35,12 +35,12 @@ class NewTest:
         def top_secret():
             return private.name * private.level * 2
 
-        @builtin
-        def call():
+        @special
+        def __call__():
             return private.top_secret()
 
-        @builtin
-        def str():
+        @special
+        def __str__():
             return "{name} is at level {level}".format(
                 name=private.name,
                 level=private.level
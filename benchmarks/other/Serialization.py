@@ -0,0 +1,79 @@
+import os
+import pickle
+import tempfile
+import time
+
+from pythonpp import *
+from pythonpp import dumpRecords, loadRecords, dumpJSONLines, loadJSONLines
+
+NUM_RECORDS = 100000
+
+
+@PythonPP
+class NewTest:
+    def namespace(public, private):
+        public.publicvar: int
+        private.name: str
+        private.level: int
+
+        @constructor
+        def NewTest(name, level):
+            public.publicvar = 1
+            private.name = name
+            private.level = level
+
+        @method(public)
+        def get_level():
+            return private.level
+
+        @special
+        def __getstate__():
+            return public.publicvar, private.name, private.level
+
+        @special
+        def __setstate__(state):
+            public.publicvar, private.name, private.level = state
+
+
+def objects():
+    for level in range(NUM_RECORDS):
+        yield NewTest("steven", level)
+
+
+def dump_pickle(file):
+    for obj in objects():
+        pickle.dump(obj, file)
+
+
+def load_pickle(path):
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def throughput(dump, load, mode):
+    with tempfile.NamedTemporaryFile("w" + mode, delete=False) as file:
+        beg = time.time()
+        dump(file)
+        dumped = time.time() - beg
+    try:
+        beg = time.time()
+        for _ in load(file.name):
+            pass
+        loaded = time.time() - beg
+    finally:
+        os.remove(file.name)
+    return NUM_RECORDS / dumped, NUM_RECORDS / loaded
+
+
+if __name__ == "__main__":
+    for name, dump, load, mode in (
+        ("pickle", dump_pickle, load_pickle, "b"),
+        ("records", lambda file: dumpRecords(NewTest, objects(), file), lambda path: loadRecords(NewTest, path), "b"),
+        ("json lines", lambda file: dumpJSONLines(NewTest, objects(), file), lambda path: loadJSONLines(NewTest, path), ""),
+    ):
+        dumped, loaded = throughput(dump, load, mode)
+        print(name, "dumped", dumped, "and loaded", loaded, "records per second")
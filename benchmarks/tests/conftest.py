@@ -0,0 +1,4 @@
+from pythonpp import encapsulationChecks
+
+# The tests run with full encapsulation enforcement, even when PYTHONPP_MODE=production.
+encapsulationChecks(True)
@@ -13,6 +13,9 @@ class NewTest:
         public.static.pubstat = 420
         private.static.privstat = 19
 
+        private.name: str
+        private.level: int
+
         @constructor
         def NewTest(name, level):
             public.publicvar = 1
@@ -29,12 +32,10 @@ class NewTest:
 
         @method(public)
         def set_name(new_name):
-            assert type(new_name) is str
             private.name = new_name
 
         @method(public)
         def set_level(new_level):
-            assert type(new_level) is int
             private.level = new_level
             
         @method(private)
@@ -0,0 +1,103 @@
+import pytest
+
+from pythonpp import PythonPP, interface, method, constructor
+
+
+@interface
+class Shape:
+    def namespace(public, private):
+        @method(public, abstract=True)
+        def area():
+            pass
+
+        @method(public, abstract=True)
+        def name():
+            pass
+
+
+@PythonPP
+class Polygon(Shape):
+    def namespace(public, private):
+        @method(public)
+        def name():
+            return "polygon"
+
+        @method(public)
+        def describe():
+            return "{name} of area {area}".format(name=public.name(), area=public.area())
+
+
+@PythonPP(final=True)
+class Square(Polygon):
+    def namespace(public, private):
+        @constructor
+        def Square(side):
+            private.side = side
+
+        @method(public)
+        def area():
+            return private.side ** 2
+
+        @method(public)
+        def name():
+            return "square"
+
+
+def test_abstract_classes_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        Shape()
+    with pytest.raises(TypeError):
+        Polygon()
+
+
+def test_implementations_are_dispatched_from_the_base():
+    assert Square(3).describe() == "square of area 9"
+
+
+def test_final_classes_cannot_be_subclassed():
+    with pytest.raises(TypeError):
+
+        class Cube(Square):
+            pass
+
+
+def test_final_classes_must_implement_abstract_methods():
+    with pytest.raises(TypeError):
+
+        @PythonPP(final=True)
+        class Triangle(Polygon):
+            def namespace(public, private):
+                pass
+
+
+def test_interfaces_only_declare_abstract_methods():
+    with pytest.raises(TypeError):
+
+        @interface
+        class Named:
+            def namespace(public, private):
+                @method(public)
+                def name():
+                    return "named"
+
+
+def test_static_methods_cannot_be_abstract():
+    with pytest.raises(AttributeError):
+
+        @PythonPP
+        class Counter:
+            def namespace(public, private):
+                @method(public.static, abstract=True)
+                def count():
+                    pass
+
+
+def test_subclasses_override_methods():
+    class Hexagon(Polygon):
+        def area(self):
+            return 6
+
+        def name(self):
+            return "hexagon"
+
+    assert Hexagon().describe() == "hexagon of area 6"
@@ -0,0 +1,94 @@
+import copy
+
+from pythonpp import PythonPP, method, constructor, special, clone
+
+
+@PythonPP
+class Template:
+    def namespace(public, private):
+        @constructor
+        def Template(name, items):
+            public.tag = "template"
+            private.name = name
+            private.items = items
+
+        @method(public)
+        def get_name():
+            return private.name
+
+        @method(public)
+        def set_name(new_name):
+            private.name = new_name
+
+        @method(public)
+        def get_items():
+            return private.items
+
+        @method(public)
+        def shout():
+            return private.loud()
+
+        @method(private)
+        def loud():
+            return get_name().upper()
+
+
+def test_clone_copies_stores():
+    template = Template("steven", [1])
+    obj = clone(template)
+    assert type(obj) is Template
+    assert obj.tag == "template"
+    assert obj.get_name() == "steven"
+    obj.set_name("esteban")
+    obj.tag = "clone"
+    assert template.get_name() == "steven"
+    assert template.tag == "template"
+    assert obj.shout() == "ESTEBAN"
+    assert template.shout() == "STEVEN"
+
+
+def test_clone_encapsulation():
+    obj = clone(Template("steven", [1]))
+    assert not hasattr(obj, "name")
+    assert not hasattr(obj, "loud")
+
+
+def test_copy_and_deepcopy():
+    template = Template("steven", [1])
+    shallow = copy.copy(template)
+    deep = copy.deepcopy(template)
+    assert shallow.get_items() is template.get_items()
+    deep.get_items().append(2)
+    assert template.get_items() == [1]
+    assert deep.get_items() == [1, 2]
+    assert deep.shout() == "STEVEN"
+
+
+def test_copy_on_write_clone():
+    template = Template("steven", [1])
+    obj = clone(template, copyOnWrite=True)
+    assert obj.shout() == "STEVEN"
+    obj.set_name("esteban")
+    assert obj.shout() == "ESTEBAN"
+    assert template.shout() == "STEVEN"
+
+
+def test_copy_on_write_source_write():
+    template = Template("steven", [1])
+    obj = clone(template, copyOnWrite=True)
+    template.set_name("esteban")
+    assert template.shout() == "ESTEBAN"
+    assert obj.shout() == "STEVEN"
+
+
+def test_copy_on_write_chain():
+    template = Template("steven", [1])
+    first = clone(template, copyOnWrite=True)
+    second = clone(first, copyOnWrite=True)
+    third = clone(first)
+    first.set_name("first")
+    second.set_name("second")
+    assert template.shout() == "STEVEN"
+    assert first.shout() == "FIRST"
+    assert second.shout() == "SECOND"
+    assert third.shout() == "STEVEN"
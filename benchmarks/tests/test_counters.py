@@ -0,0 +1,164 @@
+import gc
+import json
+from threading import Thread
+
+import pytest
+
+from pythonpp import (
+    PythonPP,
+    method,
+    constructor,
+    accessCounters,
+    counterSnapshot,
+    countersToJSON,
+    countersToPrometheus,
+    resetCounters,
+)
+from pythonpp.profiling import ThreadCounts
+
+accessCounters(True)
+
+
+@PythonPP
+class Counted:
+    def namespace(public, private):
+        public.static.instances = 0
+
+        @constructor
+        def Counted(name):
+            public.publicvar = 1
+            private.name = name
+
+        @method(public)
+        def get_name():
+            return private.name
+
+        @method(public.static)
+        def get_instances():
+            return public.static.instances
+
+
+@PythonPP(checks=False)
+class UncheckedCounted:
+    def namespace(public, private):
+        public.static.instances = 0
+
+        @constructor
+        def UncheckedCounted(name):
+            public.publicvar = 1
+            private.name = name
+
+        @method(public)
+        def get_name():
+            return private.name
+
+        @method(public.static)
+        def get_instances():
+            return public.static.instances
+
+
+accessCounters(False)
+
+
+@PythonPP
+class Uncounted:
+    def namespace(public, private):
+        @constructor
+        def Uncounted(name):
+            private.name = name
+
+
+CLASS_NAME = __name__ + ".Counted"
+
+
+def test_uncounted_classes_are_not_registered():
+    Uncounted("steven")
+    assert all(not name.endswith(".Uncounted") for name in counterSnapshot())
+
+
+def test_allocation_counters():
+    before = counterSnapshot()[CLASS_NAME]
+    objs = [Counted("steven") for _ in range(3)]
+    after = counterSnapshot()[CLASS_NAME]
+    assert after["created"] - before["created"] == 3
+    assert after["alive"] - before["alive"] == 3
+    del objs
+    gc.collect()
+    assert counterSnapshot()[CLASS_NAME]["alive"] == before["alive"]
+
+
+@pytest.mark.parametrize("cls", [Counted, UncheckedCounted])
+def test_field_counters(cls):
+    obj = cls("steven")
+    resetCounters()
+    for _ in range(5):
+        obj.get_name()
+    obj.publicvar = 2
+    cls.get_instances()
+    snapshot = counterSnapshot()[__name__ + "." + cls.__qualname__]
+    assert snapshot["reads"]["public"]["get_name"] == 5
+    assert snapshot["reads"]["private"]["name"] == 5
+    assert snapshot["writes"]["public"]["publicvar"] == 1
+    assert snapshot["reads"]["public.static"]["instances"] == 1
+    assert snapshot["alive"] >= 1
+
+
+def test_json_export():
+    Counted("steven")
+    exported = json.loads(countersToJSON())
+    assert exported[CLASS_NAME]["created"] >= 1
+
+
+def test_prometheus_export():
+    obj = Counted("steven")
+    obj.get_name()
+    exported = countersToPrometheus()
+    assert "# TYPE pythonpp_instances_alive gauge" in exported
+    assert 'pythonpp_instances_created_total{{class="{name}"}}'.format(
+        name=CLASS_NAME
+    ) in exported
+    assert (
+        'pythonpp_field_reads_total{{class="{name}",scope="private",field="name"}}'.format(
+            name=CLASS_NAME
+        )
+        in exported
+    )
+
+
+def test_concurrent_counters():
+    obj = Counted("steven")
+    resetCounters()
+    gc.collect()
+    before = counterSnapshot()[CLASS_NAME]
+
+    def work():
+        for _ in range(2000):
+            obj.get_name()
+            Counted("esteban")
+
+    threads = [Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+    snapshot = counterSnapshot()[CLASS_NAME]
+    assert snapshot["reads"]["public"]["get_name"] == 8 * 2000
+    assert snapshot["reads"]["private"]["name"] == 8 * 2000
+    assert snapshot["created"] - before["created"] == 8 * 2000
+    assert snapshot["alive"] == before["alive"]
+
+
+def test_counts_of_finished_threads_are_folded():
+    counts = ThreadCounts()
+
+    def work():
+        counts.counts()["reads"] += 1
+
+    for _ in range(200):
+        thread = Thread(target=work)
+        thread.start()
+        thread.join()
+    gc.collect()
+    assert len(counts.shards) == 0
+    assert counts.totals() == {"reads": 200}
@@ -0,0 +1,163 @@
+import gc
+import pickle
+
+import pytest
+
+from pythonpp import PythonPP, method, constructor, Executor
+from pythonpp.executor import Worker
+
+
+@PythonPP
+class Account:
+    def namespace(public, private):
+        @constructor
+        def Account(owner, history):
+            public.owner = owner
+            private.balance = 0
+            private.history = history
+
+        @method(public)
+        def deposit(amount):
+            private.balance += amount
+            private.history.append(amount)
+            return private.balance, len(private.history)
+
+        @method(public)
+        def set_balance(balance):
+            private.balance = balance
+
+
+@PythonPP
+class Node:
+    def namespace(public, private):
+        @constructor
+        def Node(value, child):
+            private.value = value
+            private.child = child
+            private.parent = None
+
+        @method(public)
+        def set_parent(parent):
+            private.parent = parent
+
+        @method(public)
+        def set_value(value):
+            private.value = value
+
+        @method(public)
+        def total():
+            child = private.child
+            return private.value + (0 if child is None else child.total())
+
+        @method(public)
+        def parent_total():
+            parent = private.parent
+            return None if parent is None else parent.total()
+
+
+def total(node):
+    return node.total(), node.parent_total()
+
+
+def deposit(task):
+    account, amount = task
+    return (account.owner,) + account.deposit(amount)
+
+
+def fail(task):
+    raise ValueError(task)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with Executor(processes=2, classes=[Account]) as executor:
+        yield executor
+
+
+def test_map(executor):
+    account = Account("steven", [])
+    results = executor.map(deposit, [(account, 1)] * 4, chunksize=1)
+    assert results == [("steven", 1, 1)] * 4
+
+
+def test_chunks_share_objects(executor):
+    account = Account("steven", [])
+    results = executor.map(deposit, [(account, 1)] * 4, chunksize=2)
+    assert results == [("steven", 1, 1), ("steven", 2, 2)] * 2
+
+
+def test_changes_are_sent(executor):
+    account = Account("steven", [])
+    executor.map(deposit, [(account, 1)] * 4, chunksize=1)
+    account.set_balance(10)
+    account.owner = "esteban"
+    assert executor.map(deposit, [(account, 1)] * 4, chunksize=1) == [
+        ("esteban", 11, 1)
+    ] * 4
+
+
+def test_only_deltas_are_sent():
+    account = Account("steven", [])
+    worker = Worker(None, None)
+    token = 0
+    delta = lambda: worker.delta(
+        token, Account, Account.__getfields__(account), pickle.dumps
+    )
+    assert delta() is not None
+    worker.commit()
+    assert delta() is None
+    account.set_balance(10)
+    _, public, private, deleted = delta()
+    assert public == {}
+    assert set(private) == {"balance"}
+    worker.commit()
+    account.deposit(1)
+    _, public, private, deleted = delta()
+    assert set(private) == {"balance", "history"}
+
+
+def test_changes_in_place_are_sent(executor):
+    account = Account("steven", [])
+    executor.map(deposit, [(account, 1)] * 4, chunksize=1)
+    account.deposit(1)
+    assert executor.map(deposit, [(account, 1)] * 4, chunksize=1) == [
+        ("steven", 2, 2)
+    ] * 4
+
+
+def test_released_objects(executor):
+    account = Account("steven", [])
+    executor.map(deposit, [(account, 1)] * 2, chunksize=1)
+    del account
+    gc.collect()
+    assert not any(worker.sent for worker in executor.workers)
+
+
+def test_errors(executor):
+    with pytest.raises(ValueError):
+        executor.map(fail, [1, 2])
+
+
+def test_submit_errors(executor):
+    account = Account("steven", [])
+    tasks = [(account, 1)] * 4 + [(account, lambda: None)]
+    with pytest.raises(Exception):
+        executor.map(deposit, tasks, chunksize=1)
+    assert executor.map(deposit, [(account, 2)] * 2, chunksize=1) == [
+        ("steven", 2, 1)
+    ] * 2
+    unsent = Account("esteban", [])
+    with pytest.raises(Exception):
+        executor.map(deposit, [(unsent, lambda: None)])
+    assert executor.map(deposit, [(unsent, 1)] * 2, chunksize=1) == [
+        ("esteban", 1, 1)
+    ] * 2
+
+
+def test_composed_objects(executor):
+    leaf = Node(1, None)
+    root = Node(2, leaf)
+    leaf.set_parent(root)
+    assert executor.map(total, [root, leaf], chunksize=1) == [(3, None), (1, 3)]
+    leaf.set_value(5)
+    assert executor.map(total, [root, leaf], chunksize=1) == [(7, None), (5, 7)]
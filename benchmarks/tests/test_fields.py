@@ -0,0 +1,185 @@
+import sys
+from typing import Any, Literal, Optional, TypeVar
+
+import pytest
+
+from pythonpp import PythonPP, method, constructor, declaredFields, typeChecks
+
+# The classes below are validated even when Python runs with -O.
+typeChecks(True)
+
+
+@PythonPP
+class Player:
+    def namespace(public, private):
+        public.name: str
+        private.level: int
+        private.partner: Optional["Player"]
+
+        @constructor
+        def Player(name, level):
+            public.name = name
+            private.level = level
+            private.partner = None
+
+        @method(public)
+        def set_level(new_level):
+            private.level = new_level
+
+        @method(public)
+        def get_level():
+            return private.level
+
+        @method(public)
+        def set_partner(partner):
+            private.partner = partner
+
+
+@PythonPP
+class Captain(Player):
+    def namespace(public, private):
+        private.rank: int
+
+        @constructor
+        def Captain(name, level, rank):
+            Player.constructor(name, level)
+            private.rank = rank
+
+
+def test_declared_fields():
+    fields = declaredFields(Player)
+    assert fields["public"] == {"name": str}
+    assert fields["private"]["level"] is int
+    assert set(declaredFields(Captain)["private"]) == {"level", "partner", "rank"}
+
+
+def test_private_field_validation():
+    player = Player("steven", 10)
+    player.set_level(11)
+    assert player.get_level() == 11
+    with pytest.raises(TypeError):
+        player.set_level("eleven")
+    assert player.get_level() == 11
+
+
+def test_public_field_validation():
+    player = Player("steven", 10)
+    player.name = "Steven"
+    with pytest.raises(TypeError):
+        player.name = 12
+    with pytest.raises(TypeError):
+        Player(12, 10)
+
+
+def test_forward_reference_validation():
+    player = Player("steven", 10)
+    player.set_partner(Player("esteban", 9))
+    player.set_partner(None)
+    with pytest.raises(TypeError):
+        player.set_partner("esteban")
+
+
+def test_inherited_field_validation():
+    with pytest.raises(TypeError):
+        Captain("steven", 10, "first")
+    with pytest.raises(TypeError):
+        Captain("steven", "ten", 1)
+
+
+@PythonPP
+class Annotated:
+    def namespace(public, private):
+        public.mode: Literal["fast", "slow"]
+        public.missing: "Undefined"
+
+
+T = TypeVar("T")
+
+
+@PythonPP
+class Numeric:
+    def namespace(public, private):
+        public.ratio: float
+        public.signal: complex
+        public.anything: Any
+        public.generic: T
+
+
+typeChecks(__debug__)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="int | None needs Python 3.10")
+def test_union_type_validation():
+    typeChecks(True)
+    try:
+
+        @PythonPP
+        class Union:
+            def namespace(public, private):
+                public.optional: int | None
+
+    finally:
+        typeChecks(__debug__)
+
+    union = Union()
+    union.optional = 1
+    union.optional = None
+    with pytest.raises(TypeError):
+        union.optional = "one"
+
+
+def test_literal_validation():
+    annotated = Annotated()
+    annotated.mode = "fast"
+    with pytest.raises(TypeError):
+        annotated.mode = 1
+
+
+def test_numeric_tower_validation():
+    numeric = Numeric()
+    numeric.ratio = 1
+    numeric.ratio = 0.5
+    numeric.signal = 1
+    numeric.signal = 0.5
+    numeric.signal = 1j
+    with pytest.raises(TypeError):
+        numeric.ratio = 1j
+    with pytest.raises(TypeError):
+        numeric.ratio = "1"
+
+
+def test_any_is_not_validated():
+    numeric = Numeric()
+    numeric.anything = object()
+    numeric.generic = "anything"
+
+
+def test_unresolved_annotation():
+    annotated = Annotated()
+    for _ in range(2):
+        with pytest.raises(TypeError, match="cannot be resolved"):
+            annotated.missing = 1
+
+
+def test_disabled_type_checks():
+    typeChecks(False)
+    try:
+
+        @PythonPP
+        class Unchecked:
+            def namespace(public, private):
+                private.level: int
+
+                @method(public)
+                def set_level(new_level):
+                    private.level = new_level
+
+                @method(public)
+                def get_level():
+                    return private.level
+
+    finally:
+        typeChecks(__debug__)
+    unchecked = Unchecked()
+    unchecked.set_level("eleven")
+    assert unchecked.get_level() == "eleven"
@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pythonpp
+
+# Budget for the cumulative time of `import pythonpp`, in microseconds.
+IMPORT_TIME_BUDGET = 15000
+# Budget for `import pythonpp` followed by the declaration of a class without typed fields.
+DECLARATION_TIME_BUDGET = 20000
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(pythonpp.__file__)))
+# Wall-clock budgets depend on the machine and its load, so they only run on request.
+budget = pytest.mark.skipif(
+    not os.environ.get("PYTHONPP_BENCHMARKS"),
+    reason="set PYTHONPP_BENCHMARKS to check the time budgets",
+)
+
+
+def run_python(code, *options):
+    return run([sys.executable] + list(options) + ["-c", code])
+
+
+def run(command):
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPATH"] = PACKAGE_ROOT
+    return subprocess.run(
+        command,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def import_time():
+    stderr = run_python("import pythonpp", "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        columns = line.split("|")
+        if len(columns) == 3 and columns[2].strip() == "pythonpp":
+            return int(columns[1])
+    raise AssertionError("pythonpp is missing from the import time report")
+
+
+@budget
+def test_import_time_budget():
+    import_time()  # writes the bytecode cache
+    assert min(import_time() for _ in range(3)) < IMPORT_TIME_BUDGET
+
+
+DECLARATION = """
+import sys, time
+beg = time.perf_counter()
+from pythonpp import *
+
+@PythonPP
+class MyClass:
+    def namespace(public, private):
+        @constructor
+        def Constructor(name):
+            private.name = name
+
+        @method(public)
+        def get_name():
+            return private.name
+
+print(int((time.perf_counter() - beg) * 1000000), ' '.join(sys.modules))
+"""
+
+
+def declaration(tmp_path):
+    # The namespace is declared in a file, like in an application.
+    path = tmp_path / "declaration.py"
+    path.write_text(DECLARATION)
+    elapsed, *modules = run([sys.executable, str(path)]).stdout.split()
+    return int(elapsed), modules
+
+
+@budget
+def test_declaration_time_budget(tmp_path):
+    declaration(tmp_path)  # writes the bytecode cache
+    assert min(declaration(tmp_path)[0] for _ in range(3)) < DECLARATION_TIME_BUDGET
+
+
+def test_declarations_without_typed_fields_are_lazy(tmp_path):
+    _, modules = declaration(tmp_path)
+    assert "pythonpp.codegen" not in modules
+    assert "inspect" not in modules
+    assert "ast" not in modules
+
+
+def test_optional_subsystems_are_lazy():
+    modules = run_python(
+        "import sys, pythonpp; print(' '.join(sys.modules))"
+    ).stdout.split()
+    assert "pythonpp.codegen" not in modules
+    assert "pythonpp.profiling" not in modules
+    assert "pythonpp.executor" not in modules
+    assert "pythonpp.serialization" not in modules
+    assert "inspect" not in modules
+    assert "json" not in modules
+
+
+def test_lazy_attributes():
+    from pythonpp import declaredFields, counterSnapshot
+
+    assert pythonpp.declaredFields is declaredFields
+    assert pythonpp.profiling.counterSnapshot is counterSnapshot
@@ -0,0 +1,154 @@
+import pytest
+
+from pythonpp import PythonPP, method, constructor, special
+
+
+@PythonPP
+class Shared:
+    def namespace(public, private):
+        public.kind = "shared"
+        private.visits = 0
+
+        @constructor
+        def Shared(name):
+            private.name = name
+
+        @method(public)
+        def get_name():
+            return private.name
+
+        @method(public)
+        def visit():
+            private.visits += 1
+            return private.visits
+
+        @special
+        def __str__():
+            return private.name
+
+
+def test_methods_are_not_stored_on_instances():
+    obj = Shared("steven")
+    assert "get_name" not in vars(obj)
+    assert "visit" not in vars(obj)
+    assert obj.get_name() == "steven"
+
+
+def test_methods_are_bound_to_their_instance():
+    first = Shared("first")
+    second = Shared("second")
+    get_name = first.get_name
+    assert get_name() == "first"
+    assert second.get_name() == "second"
+    assert str(first) == "first"
+    assert str(second) == "second"
+
+
+def test_namespace_variables_initialize_every_instance():
+    first = Shared("first")
+    second = Shared("second")
+    assert first.kind == second.kind == "shared"
+    assert first.visit() == 1
+    assert first.visit() == 2
+    assert second.visit() == 1
+
+
+def test_constructor_outside_of_constructor():
+    with pytest.raises(AttributeError):
+        Shared.constructor("steven")
+
+
+@PythonPP
+class Local:
+    def namespace(public, private):
+        count = 0
+
+        def increment():
+            nonlocal count
+            count += 1
+            return count
+
+        @method(public)
+        def inc():
+            nonlocal count
+            count += 1
+            return count
+
+        @method(public)
+        def incTwice():
+            increment()
+            return increment()
+
+        @method(public)
+        def get():
+            return count
+
+
+def test_namespace_locals_belong_to_every_instance():
+    first = Local()
+    second = Local()
+    first.inc()
+    assert first.inc() == 2
+    assert second.inc() == 1
+    assert first.incTwice() == 4
+    assert second.get() == 1
+
+
+def test_namespace_locals_are_cloned():
+    from pythonpp import clone
+
+    original = Local()
+    original.inc()
+    copied = clone(original)
+    assert copied.inc() == 2
+    assert original.get() == 1
+
+
+@PythonPP
+class Bag:
+    def namespace(public, private):
+        log = []
+
+        def record(item):
+            log.append(item)
+
+        public.static.bags = 0
+
+        @constructor
+        def Bag(item):
+            record(item)
+
+        @method(public)
+        def items():
+            return log
+
+
+def test_mutable_namespace_locals_belong_to_every_instance():
+    Bag.bags = 2
+    first = Bag(1)
+    second = Bag(2)
+    assert first.items() == [1]
+    assert second.items() == [2]
+    assert Bag.bags == 2
+
+
+@PythonPP
+class Generated:
+    def namespace(public, private):
+        limit = 3
+
+        def plus(offset):
+            def get_plus():
+                return offset + limit
+
+            get_plus.__name__ = "get_plus_{offset}".format(offset=offset)
+            return get_plus
+
+        for offset in range(3):
+            method(public)(plus(offset))
+
+
+def test_read_only_locals_are_not_copied():
+    obj = Generated()
+    assert obj.get_plus_2() == 5
+    assert len(object.__getattribute__(obj, "__pythonpp__")) == 2
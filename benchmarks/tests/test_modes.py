@@ -0,0 +1,149 @@
+import copy
+
+import pytest
+
+from pythonpp import PythonPP, clone, constructor, encapsulationChecks, method, special, staticinit
+
+
+@PythonPP(checks=False)
+class Unchecked:
+    def namespace(public, private):
+        public.publicvar = 1
+
+        @staticinit
+        def StaticInit():
+            public.static.instances = 0
+            private.static.secret = "static secret"
+
+        @constructor
+        def Constructor(name):
+            public.static.instances += 1
+            private.name = name
+
+        @method(public)
+        def getName():
+            return private.name
+
+        @method(public)
+        def setName(name):
+            private.name = name
+
+        @method(private)
+        def shout():
+            return private.name.upper()
+
+        @method(public)
+        def loud():
+            return private.shout()
+
+        @method(public.static)
+        def getSecret():
+            return private.static.secret
+
+        @special
+        def __str__():
+            return "Unchecked {name}".format(name=private.name)
+
+
+@PythonPP(checks=False)
+class UncheckedChild(Unchecked):
+    def namespace(public, private):
+        @constructor
+        def Constructor(name):
+            Unchecked.constructor(name)
+            private.level = 2
+
+        @method(public)
+        def getLevel():
+            return private.level
+
+
+def test_methods_and_variables():
+    obj = Unchecked("steven")
+    assert obj.getName() == "steven"
+    assert obj.loud() == "STEVEN"
+    obj.setName("Steven")
+    assert obj.getName() == "Steven"
+    assert obj.publicvar == 1
+    assert str(obj) == "Unchecked Steven"
+
+
+def test_private_variables_are_hidden():
+    obj = Unchecked("steven")
+    with pytest.raises(AttributeError):
+        obj.name
+    with pytest.raises(AttributeError):
+        obj.shout()
+    assert "name" not in vars(obj)
+
+
+def test_statics():
+    before = Unchecked.instances
+    obj = Unchecked("steven")
+    assert Unchecked.instances == before + 1
+    assert Unchecked.getSecret() == "static secret"
+    # Without checks static variables can be read from instances.
+    assert obj.instances == Unchecked.instances
+
+
+def test_plain_attribute_access():
+    assert Unchecked.__getattribute__ is object.__getattribute__
+    assert Unchecked.__setattr__ is object.__setattr__
+
+
+def test_clone():
+    obj = Unchecked("steven")
+    for copied in (clone(obj), clone(obj, copyOnWrite=True), copy.copy(obj), copy.deepcopy(obj)):
+        assert copied.getName() == "steven"
+        copied.setName("other")
+        assert copied.getName() == "other"
+        assert obj.getName() == "steven"
+
+
+def test_fields():
+    obj = Unchecked("steven")
+    public, private = Unchecked.__getfields__(obj)
+    assert public == {"publicvar": 1}
+    assert private == {"name": "steven"}
+    Unchecked.__setfields__(obj, {}, {"name": "other"})
+    assert obj.getName() == "other"
+
+
+def test_inheritance():
+    obj = UncheckedChild("steven")
+    assert obj.getName() == "steven"
+    assert obj.getLevel() == 2
+    assert obj.loud() == "STEVEN"
+
+
+def test_global_switch():
+    encapsulationChecks(False)
+    try:
+
+        @PythonPP
+        class Global:
+            def namespace(public, private):
+                @constructor
+                def Constructor():
+                    private.value = 1
+
+                @method(public)
+                def getValue():
+                    return private.value
+
+    finally:
+        encapsulationChecks(True)
+    assert Global.__getattribute__ is object.__getattribute__
+    assert Global().getValue() == 1
+
+
+def test_checked_by_default():
+    @PythonPP
+    class Checked:
+        def namespace(public, private):
+            @staticinit
+            def StaticInit():
+                public.static.value = 1
+
+    with pytest.raises(Exception):
+        Checked().value
@@ -0,0 +1,206 @@
+import io
+from typing import List, Optional
+
+import pytest
+
+from pythonpp import PythonPP, method, constructor, typeChecks
+from pythonpp import (
+    schemaOf,
+    encodeRecords,
+    decodeRecords,
+    dumpRecords,
+    loadRecords,
+    dumpJSONLines,
+    loadJSONLines,
+)
+
+# The classes below are validated even when Python runs with -O.
+typeChecks(True)
+
+
+@PythonPP
+class Record:
+    def namespace(public, private):
+        public.name: str
+        public.data: bytes
+        private.level: int
+        private.score: Optional[float]
+        private.tags: List[str]
+        private.alive: bool
+
+        @constructor
+        def Record(name, level, score=None):
+            public.name = name
+            public.data = bytes([level % 256])
+            private.level = level
+            private.score = score
+            private.tags = [name] * (level % 3)
+            private.alive = level % 2 == 0
+
+        @method(public)
+        def state():
+            return (
+                public.name,
+                public.data,
+                private.level,
+                private.score,
+                private.tags,
+                private.alive,
+            )
+
+
+@PythonPP
+class Untyped:
+    def namespace(public, private):
+        public.publicvar = 1
+
+        @constructor
+        def Untyped(name, level):
+            private.name = name
+            private.level = level
+
+        @method(public)
+        def state():
+            return public.publicvar, private.name, private.level
+
+
+@PythonPP
+class Partial:
+    def namespace(public, private):
+        public.name: str
+
+        @constructor
+        def Partial(name, level):
+            public.name = name
+            private.level = level
+
+        @method(public)
+        def state():
+            return public.name, private.level
+
+
+@PythonPP
+class Containers:
+    def namespace(public, private):
+        private.tags: tuple
+        private.level: int
+
+        @constructor
+        def Containers(level):
+            private.tags = ("a", (1, 2))
+            private.level = level
+            private.values = {1: {"x"}, "__tuple__": frozenset([b"raw"])}
+            private.pairs = [(1, 2), {"__set__": []}]
+
+        @method(public)
+        def state():
+            return private.tags, private.values, private.pairs, private.level
+
+
+typeChecks(__debug__)
+
+
+def records():
+    for level in range(20):
+        yield Record("record", level, None if level % 4 else level / 4)
+
+
+def states(objects):
+    return [obj.state() for obj in objects]
+
+
+def test_schema():
+    assert schemaOf(Record).description == [
+        ["public", "name", "str", False],
+        ["public", "data", "bytes", False],
+        ["private", "level", "q", False],
+        ["private", "score", "d", True],
+        ["private", "tags", "json", False],
+        ["private", "alive", "?", False],
+    ]
+    assert schemaOf(Untyped).description == []
+
+
+def test_binary_records():
+    data = b"".join(encodeRecords(Record, records()))
+    assert states(decodeRecords(Record, data)) == states(records())
+
+
+def test_binary_files(tmp_path):
+    path = tmp_path / "records.bin"
+    with open(path, "wb") as file:
+        assert dumpRecords(Record, records(), file) == 20
+    assert states(loadRecords(Record, path)) == states(records())
+    with open(path, "rb") as file:
+        assert states(loadRecords(Record, file)) == states(records())
+    buffer = io.BytesIO(path.read_bytes())
+    assert states(loadRecords(Record, buffer)) == states(records())
+
+
+def test_schema_mismatch():
+    @PythonPP
+    class Other:
+        def namespace(public, private):
+            public.name: str
+
+    data = b"".join(encodeRecords(Record, records()))
+    with pytest.raises(ValueError):
+        list(decodeRecords(Other, data))
+
+
+def test_json_lines(tmp_path):
+    path = tmp_path / "records.jsonl"
+    with open(path, "w") as file:
+        assert dumpJSONLines(Record, records(), file) == 20
+    assert states(loadJSONLines(Record, path)) == states(records())
+    assert states(loadJSONLines(Record, io.StringIO(path.read_text()))) == states(
+        records()
+    )
+
+
+def test_json_lines_are_validated():
+    line = '{"public":{"name":"x","data":""},"private":{"level":"high","score":null,"tags":[],"alive":true}}\n'
+    with pytest.raises(TypeError):
+        list(loadJSONLines(Record, io.StringIO(line)))
+
+
+@pytest.mark.parametrize("cls", [Untyped, Partial])
+def test_variables_without_annotations(cls, tmp_path):
+    objects = [cls("steven", level) for level in range(3)]
+    data = b"".join(encodeRecords(cls, objects))
+    assert states(decodeRecords(cls, data)) == states(objects)
+    path = tmp_path / "objects.jsonl"
+    with open(path, "w") as file:
+        dumpJSONLines(cls, objects, file)
+    assert states(loadJSONLines(cls, path)) == states(objects)
+
+
+def test_containers_keep_their_types(tmp_path):
+    objects = [Containers(level) for level in range(2)]
+    data = b"".join(encodeRecords(Containers, objects))
+    assert states(decodeRecords(Containers, data)) == states(objects)
+    path = tmp_path / "objects.jsonl"
+    with open(path, "w") as file:
+        dumpJSONLines(Containers, objects, file)
+    loaded = states(loadJSONLines(Containers, path))
+    assert loaded == states(objects)
+    assert type(loaded[0][2][0]) is tuple
+
+
+def test_values_without_json_types():
+    obj = Containers(0)
+    obj.extra = object()
+    with pytest.raises(TypeError, match='"extra"'):
+        b"".join(encodeRecords(Containers, [obj]))
+    with pytest.raises(TypeError, match='"extra"'):
+        dumpJSONLines(Containers, [obj], io.StringIO())
+
+
+def test_big_integers():
+    objects = [Containers(2 ** 70)]
+    with pytest.raises(ValueError, match='"level"'):
+        b"".join(encodeRecords(Containers, objects))
+    file = io.StringIO()
+    dumpJSONLines(Containers, objects, file)
+    file.seek(0)
+    assert states(loadJSONLines(Containers, file)) == states(objects)
@@ -0,0 +1,126 @@
+from threading import Thread
+
+import pytest
+
+from pythonpp import (
+    PythonPP,
+    method,
+    staticinit,
+    atomicIncrement,
+    compareAndSet,
+    staticSnapshot,
+)
+
+NUM_THREADS = 8
+NUM_INCREMENTS = 2000
+
+
+@PythonPP
+class Registry:
+    def namespace(public, private):
+        @staticinit
+        def StaticInit():
+            public.static.state = "closed"
+            private.static.hits = 0
+
+        @method(public.static)
+        def hit():
+            return atomicIncrement(private.static, "hits")
+
+        @method(public.static)
+        def open():
+            return compareAndSet(public.static, "state", "closed", "open")
+
+        @method(public.static)
+        def hits():
+            return private.static.hits
+
+        @method(public.static)
+        def private_snapshot():
+            return staticSnapshot(private.static)
+
+        @method(public.static)
+        def public_snapshot():
+            return staticSnapshot(public.static)
+
+
+def run_threads(target):
+    threads = [Thread(target=target) for _ in range(NUM_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_atomic_increment():
+    before = Registry.hits()
+
+    def hit():
+        for _ in range(NUM_INCREMENTS):
+            Registry.hit()
+
+    run_threads(hit)
+    assert Registry.hits() == before + NUM_THREADS * NUM_INCREMENTS
+
+
+def test_compare_and_set():
+    results = []
+    run_threads(lambda: results.append(Registry.open()))
+    assert results.count(True) == 1
+    assert Registry.state == "open"
+
+
+def test_static_snapshot():
+    assert "hits" in Registry.private_snapshot()
+    snapshot = Registry.public_snapshot()
+    assert "state" in snapshot
+    assert "hit" not in snapshot
+    assert "namespace" not in snapshot
+
+
+def test_snapshot_requires_static_scope():
+    with pytest.raises(TypeError):
+        staticSnapshot(Registry)
+
+
+def test_static_snapshot_without_checks():
+    @PythonPP(checks=False)
+    class Unchecked:
+        def namespace(public, private):
+            @staticinit
+            def StaticInit():
+                public.static.count = 0
+                private.static.secret = 1
+
+            @method(public)
+            def get():
+                return public.static.count
+
+            @method(private)
+            def hidden():
+                return private.static.secret
+
+            @method(public.static)
+            def snapshots():
+                return staticSnapshot(public.static), staticSnapshot(private.static)
+
+    assert Unchecked.snapshots() == ({"count": 0}, {"secret": 1})
+
+
+def test_concurrent_declarations():
+    classes = []
+
+    def declare():
+        @PythonPP
+        class Declared:
+            def namespace(public, private):
+                public.static.value = 1
+
+                @method(public)
+                def get():
+                    return 2
+
+        classes.append(Declared)
+
+    run_threads(declare)
+    assert [theClass().get() for theClass in classes] == [2] * NUM_THREADS
@@ -1 +1,42 @@
-from .pythonpp import *
\ No newline at end of file
+from .pythonpp import *
+from .pythonpp import __all__
+
+# Optional subsystems are imported on first use to keep `import pythonpp` cheap.
+__LAZY = {
+    "codegen": None,
+    "declaredFields": "codegen",
+    "executor": None,
+    "Executor": "executor",
+    "profiling": None,
+    "counterSnapshot": "profiling",
+    "countersToJSON": "profiling",
+    "countersToPrometheus": "profiling",
+    "resetCounters": "profiling",
+    "serialization": None,
+    "schemaOf": "serialization",
+    "encodeRecords": "serialization",
+    "decodeRecords": "serialization",
+    "dumpRecords": "serialization",
+    "loadRecords": "serialization",
+    "dumpJSONLines": "serialization",
+    "loadJSONLines": "serialization",
+}
+
+
+def __getattr__(name):
+    if name not in __LAZY:
+        raise AttributeError(
+            "module {module!r} has no attribute {name!r}".format(
+                module=__name__, name=name
+            )
+        )
+    import importlib
+
+    module = importlib.import_module("." + (__LAZY[name] or name), __name__)
+    value = module if __LAZY[name] is None else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__LAZY))
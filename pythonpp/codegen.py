@@ -0,0 +1,160 @@
+"""
+Typed field declarations for Python++ classes.
+Loaded when a class with typed fields is declared with type checking enabled, see `pythonpp.typeChecks`.
+"""
+import ast
+import inspect
+import textwrap
+import types
+import typing
+
+__UNIONS = (typing.Union, getattr(types, "UnionType", typing.Union))
+# Like in PEP 484, int is accepted for float, and int and float for complex.
+__PROMOTED = {float: (float, int), complex: (complex, float, int)}
+
+
+def __parseFieldDeclarations(namespace):
+    fields = {"public": {}, "private": {}}
+    try:
+        source = textwrap.dedent(inspect.getsource(namespace))
+        filename = inspect.getsourcefile(namespace) or "<namespace>"
+    except (OSError, TypeError):
+        return fields
+    code = namespace.__code__
+    scopeNames = dict(zip(code.co_varnames[: code.co_argcount], ("public", "private")))
+    for node in ast.walk(ast.parse(source)):
+        if not (
+            isinstance(node, ast.AnnAssign)
+            and isinstance(node.target, ast.Attribute)
+            and isinstance(node.target.value, ast.Name)
+            and node.target.value.id in scopeNames
+        ):
+            continue
+        expression = ast.Expression(body=node.annotation)
+        try:
+            fieldType = eval(
+                compile(expression, filename, "eval"), namespace.__globals__
+            )
+        except NameError:
+            fieldType = ast.get_source_segment(source, node.annotation)
+        fields[scopeNames[node.target.value.id]][node.target.attr] = fieldType
+    return fields
+
+
+def __typeName(fieldType):
+    return getattr(fieldType, "__qualname__", None) or str(fieldType)
+
+
+def __acceptedTypes(fieldType, globalns):
+    if isinstance(fieldType, str):
+        fieldType = eval(fieldType, globalns)
+    if fieldType is None:
+        return (type(None),)
+    if fieldType is typing.Any or isinstance(fieldType, typing.TypeVar):
+        return None
+    if isinstance(fieldType, type):
+        return None if fieldType is object else __PROMOTED.get(fieldType, (fieldType,))
+    if hasattr(fieldType, "__forward_arg__"):
+        return __acceptedTypes(fieldType.__forward_arg__, globalns)
+    origin = typing.get_origin(fieldType)
+    if origin is typing.Literal:
+        # Only the types of the literal values are checked.
+        return tuple(dict.fromkeys(type(argument) for argument in typing.get_args(fieldType)))
+    if origin not in __UNIONS:
+        return (origin,) if isinstance(origin, type) else None
+    # typing.Union (and Optional, which is a Union with None) or int | None
+    accepted = ()
+    for argument in typing.get_args(fieldType):
+        argumentTypes = __acceptedTypes(argument, globalns)
+        if argumentTypes is None:
+            return None
+        accepted += argumentTypes
+    return accepted or None
+
+
+def __compileValidator(namespace, name, fieldType):
+    try:
+        accepted = __acceptedTypes(fieldType, namespace.__globals__)
+    except NameError:
+        # Forward references (e.g. to the class being declared) are resolved
+        # the first time the field is validated.
+        resolved = []
+
+        def validateForwardReference(value):
+            if not resolved:
+                try:
+                    accepted = __acceptedTypes(fieldType, namespace.__globals__)
+                except NameError as error:
+                    raise TypeError(
+                        'The type {type} of the field "{name}" cannot be resolved: {error}.'.format(
+                            type=__typeName(fieldType), name=name, error=error
+                        )
+                    ) from None
+                resolved.append(__typeValidator(name, fieldType, accepted))
+            if resolved[0] is not None:
+                resolved[0](value)
+
+        return validateForwardReference
+
+    return __typeValidator(name, fieldType, accepted)
+
+
+def __typeValidator(name, fieldType, accepted):
+    if accepted is None:
+        return None
+    message = 'The field "{name}" must be of type {expected}, not {{actual}}.'.format(
+        name=name, expected=__typeName(fieldType)
+    )
+
+    def validate(value):
+        if not isinstance(value, accepted):
+            raise TypeError(message.format(actual=type(value).__qualname__))
+
+    return validate
+
+
+def compileValidators(cls):
+    """
+    Compiles the validators of the typed fields declared by a Python++ class and its bases.
+    Returns the public and private validators, keyed by field name.
+    """
+    validators = {"public": {}, "private": {}}
+    for base in reversed(cls.__mro__):
+        if "namespace" not in base.__dict__:
+            continue
+        for scopeName, declarations in __parseFieldDeclarations(
+            base.namespace
+        ).items():
+            for name, fieldType in declarations.items():
+                validator = __compileValidator(base.namespace, name, fieldType)
+                if validator is None:
+                    validators[scopeName].pop(name, None)
+                else:
+                    validators[scopeName][name] = validator
+    return validators["public"], validators["private"]
+
+
+def declaredFields(cls):
+    """
+    Returns the typed fields declared in the namespace of a Python++ class and its bases.
+
+    ### Example
+    ```
+    @PythonPP
+    class MyClass:
+        def namespace(public, private):
+            public.name: str
+            private.level: int
+
+    declaredFields(MyClass)
+    # > {'public': {'name': <class 'str'>}, 'private': {'level': <class 'int'>}}
+    ```
+    """
+    fields = {"public": {}, "private": {}}
+    for base in reversed(cls.__mro__):
+        if "namespace" in base.__dict__:
+            for scopeName, declarations in __parseFieldDeclarations(
+                base.namespace
+            ).items():
+                fields[scopeName].update(declarations)
+    return fields
@@ -0,0 +1,417 @@
+"""
+A process pool for functions working on Python++ objects.
+Loaded on first use, see `pythonpp.Executor`.
+"""
+import hashlib
+import importlib
+import io
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import weakref
+
+
+class Pickled(bytes):
+    """
+    A variable pickled by `ReferencePickler.pickled`.
+    Workers unpickle it again for every chunk, so changes made in place by a chunk do not reach the next one.
+    """
+
+
+class Digest(bytes):
+    """
+    The hash of a `Pickled` variable, kept by `Worker` to tell whether the variable changed.
+    """
+
+
+def __reference(token, cls):
+    # Stands for a Python++ object in the pickles of `ReferencePickler`.
+    raise pickle.UnpicklingError(
+        "Python++ objects sent to an Executor can only be unpickled by its workers."
+    )
+
+
+class ReferencePickler(pickle.Pickler):
+    """
+    Pickles the items of a chunk, replacing the Python++ objects with their tokens.
+    The objects are found with `reducer_override`, which the pickler does not call for
+    builtin values like lists of numbers, unlike `persistent_id`.
+    The variables of the objects that changed since they were last sent to the worker
+    are collected in `transfers`, which are pickled the same way.
+    """
+
+    def __init__(self, file, executor, worker):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.executor = executor
+        self.worker = worker
+        self.getters = executor.getters
+        self.tokens = {}
+        self.transfers = {}
+
+    def reducer_override(self, value):
+        cls = type(value)
+        getFields = self.getters.get(cls)
+        if getFields is None:
+            getFields = self.getters[cls] = getattr(cls, "__getfields__", False)
+        if getFields is False:
+            return NotImplemented
+        # The variables of an object are compared once per chunk.
+        token = self.tokens.get(id(value))
+        if token is None:
+            token = self.tokens[id(value)] = self.executor.token(value)
+            delta = self.worker.delta(token, cls, getFields(value), self.pickled)
+            if delta is not None:
+                self.transfers[token] = delta
+        return globals()["__reference"], (token, cls)
+
+    def pickled(self, value):
+        """
+        Pickles a variable on its own, with the tokens of the chunk.
+        The objects it holds are collected in `transfers` like the objects of the chunk.
+        """
+        file = io.BytesIO()
+        pickler = ReferencePickler(file, self.executor, self.worker)
+        pickler.tokens = self.tokens
+        pickler.transfers = self.transfers
+        pickler.dump(value)
+        return Pickled(file.getvalue())
+
+    def dumpChunk(self, chunk):
+        """
+        Pickles a chunk followed by the variables of the objects it refers to.
+        Objects held by these variables are replaced with their tokens as well,
+        so their own variables are pickled next, until no object is left to transfer.
+        """
+        self.dump(chunk)
+        while self.transfers:
+            transfers = dict(self.transfers)
+            self.transfers.clear()
+            self.dump(transfers)
+
+
+class ReferenceUnpickler(pickle.Unpickler):
+    """
+    Unpickles the items of a chunk with the Python++ objects of a `WorkerCache`.
+    """
+
+    def __init__(self, file, cache):
+        super().__init__(file)
+        self.cache = cache
+
+    def find_class(self, module, name):
+        if module == __name__ and name == "__reference":
+            return self.cache.reference
+        return super().find_class(module, name)
+
+    @classmethod
+    def unpickle(cls, pickled, cache):
+        return cls(io.BytesIO(pickled), cache).load()
+
+
+class WorkerCache:
+    """
+    The Python++ objects received by a worker process, with the variables they were sent with.
+    """
+
+    missing = object()
+
+    def __init__(self):
+        self.objects = {}
+        self.referenced = set()
+        self.unsynchronized = []
+
+    def load(self, payload, released):
+        """
+        Returns the chunk pickled by `ReferencePickler.dumpChunk`
+        with its objects as they were when it was submitted.
+        """
+        for token in released:
+            self.objects.pop(token, None)
+        self.referenced.clear()
+        file = io.BytesIO(payload)
+        unpickler = ReferenceUnpickler(file, self)
+        chunk = unpickler.load()
+        while file.tell() < len(payload):
+            self.receive(unpickler.load())
+        # Unpickling the variables of an object may refer to more objects.
+        while self.unsynchronized:
+            self.synchronize(self.unsynchronized.pop())
+        return chunk
+
+    def reference(self, token, cls):
+        # The variables of an object may arrive after the objects referring to it,
+        # so objects are synchronized once the whole chunk is loaded.
+        entry = self.objects.get(token)
+        if entry is None:
+            entry = self.objects[token] = (object.__new__(cls), {}, {})
+        if token not in self.referenced:
+            self.referenced.add(token)
+            self.unsynchronized.append(token)
+        return entry[0]
+
+    def receive(self, transfers):
+        for token, (cls, public, private, deleted) in transfers.items():
+            if token not in self.objects:
+                self.objects[token] = (object.__new__(cls), {}, {})
+            _, sentPublic, sentPrivate = self.objects[token]
+            for sent, changed, names in (
+                (sentPublic, public, deleted[0]),
+                (sentPrivate, private, deleted[1]),
+            ):
+                sent.update(changed)
+                for name in names:
+                    del sent[name]
+
+    def synchronize(self, token):
+        # Every chunk sees the object as it was sent,
+        # so the variables changed by previous chunks are reset first.
+        instance, sentPublic, sentPrivate = self.objects[token]
+        cls = type(instance)
+        changed = []
+        deleted = []
+        for sent, current in zip((sentPublic, sentPrivate), cls.__getfields__(instance)):
+            values = {}
+            for name, value in sent.items():
+                if type(value) is Pickled:
+                    values[name] = ReferenceUnpickler.unpickle(value, self)
+                elif current.get(name, self.missing) is not value:
+                    values[name] = value
+            changed.append(values)
+            deleted.append([name for name in current if name not in sent])
+        if any(changed) or any(deleted):
+            cls.__setfields__(instance, changed[0], changed[1], deleted)
+
+
+class Worker:
+    """
+    A worker process of an `Executor` and the variables sent to it for each object.
+    The variables of a chunk are only recorded as sent once the chunk is sent.
+    """
+
+    missing = object()
+    # Variables holding values of these types are compared with the values sent before.
+    # Other values may be changed in place, so they are pickled and compared with the hash
+    # of the pickle sent before, which also catches objects changed inside them.
+    scalar = frozenset((type(None), bool, int, float, complex, str, bytes, range))
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        self.sent = {}
+        self.pending = {}
+        self.released = []
+
+    def delta(self, token, cls, fields, pickled):
+        """
+        Returns the variables of an object that changed since it was last sent,
+        or None if none did.
+        `pickled` pickles the variables that are not scalar, see `ReferencePickler.pickled`.
+        """
+        sent = self.sent.get(token)
+        state = []
+        changes = []
+        deletions = []
+        for current, previous in zip(fields, sent or ({}, {})):
+            values = {}
+            changed = {}
+            for name, value in current.items():
+                old = previous.get(name, self.missing)
+                if type(value) in self.scalar:
+                    values[name] = value
+                    if old is value or type(value) is type(old) and old == value:
+                        continue
+                else:
+                    value = pickled(value)
+                    digest = values[name] = Digest(
+                        hashlib.blake2b(value, digest_size=16).digest()
+                    )
+                    if type(old) is Digest and old == digest:
+                        continue
+                changed[name] = value
+            state.append(values)
+            changes.append(changed)
+            deletions.append([name for name in previous if name not in current])
+        self.pending[token] = tuple(state)
+        if sent is None or any(changes) or any(deletions):
+            return (cls,) + tuple(changes) + (tuple(deletions),)
+        return None
+
+    def commit(self):
+        # The chunk reached the worker.
+        self.sent.update(self.pending)
+        self.pending.clear()
+        self.released = []
+
+
+def __serve(connection, modules, initializer, initargs):
+    # Importing the modules declares their classes and runs the static initializers,
+    # once for the lifetime of the worker.
+    for module in modules:
+        importlib.import_module(module)
+    if initializer is not None:
+        initializer(*initargs)
+    cache = WorkerCache()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        index, function, payload, released = message
+        try:
+            chunk = cache.load(payload, released)
+            connection.send((index, True, [function(item) for item in chunk]))
+        except Exception as error:
+            try:
+                connection.send((index, False, error))
+            except Exception:
+                connection.send((index, False, RuntimeError(repr(error))))
+    connection.close()
+
+
+class Executor:
+    """
+    A process pool that keeps the Python++ objects passed to it cached in its workers.
+    An object is sent whole the first time a worker needs it,
+    and afterwards only the variables that changed since are sent.
+    Like with `multiprocessing.Pool`, each chunk of items gets the objects as they were
+    when the chunk was submitted, and changes made in the workers are not sent back.
+
+    ### Example
+    ```
+    with Executor(classes=[MyClass]) as executor:
+        results = executor.map(work, [(obj, item) for item in items])
+    ```
+
+    ### Parameters
+    `processes`: The number of worker processes. Defaults to `os.cpu_count()`.
+
+    `classes`: The Python++ classes the workers import when they start,
+    so their static initializers run once per worker.
+
+    `initializer`: A function called with `initargs` when each worker starts.
+
+    `context`: The multiprocessing start method, e.g. `"spawn"`.
+    """
+
+    def __init__(
+        self, processes=None, classes=(), initializer=None, initargs=(), context=None
+    ):
+        context = multiprocessing.get_context(context)
+        modules = sorted({cls.__module__ for cls in classes} - {"__main__"})
+        self.workers = []
+        self.tokens = {}
+        self.nextToken = 0
+        self.getters = {}
+        for _ in range(processes or os.cpu_count() or 1):
+            connection, child = context.Pipe()
+            process = context.Process(
+                target=globals()["__serve"],
+                args=(child, modules, initializer, initargs),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.workers.append(Worker(process, connection))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def token(self, instance):
+        key = id(instance)
+        entry = self.tokens.get(key)
+        if entry is not None and entry[0]() is instance:
+            return entry[1]
+        token = self.nextToken
+        self.nextToken += 1
+        release = lambda reference: self.release(key, token)
+        self.tokens[key] = (weakref.ref(instance, release), token)
+        return token
+
+    def release(self, key, token):
+        # Objects collected in the parent process are dropped from the worker caches
+        # with the next task sent to each worker.
+        entry = self.tokens.get(key)
+        if entry is not None and entry[1] == token:
+            del self.tokens[key]
+        for worker in self.workers:
+            worker.pending.pop(token, None)
+            if worker.sent.pop(token, None) is not None:
+                worker.released.append(token)
+
+    def submit(self, worker, index, function, chunk):
+        file = io.BytesIO()
+        try:
+            ReferencePickler(file, self, worker).dumpChunk(chunk)
+            worker.connection.send((index, function, file.getvalue(), worker.released))
+        except BaseException:
+            worker.pending.clear()
+            raise
+        worker.commit()
+
+    def map(self, function, iterable, chunksize=None):
+        """
+        Calls `function` with every item of `iterable` in the worker processes
+        and returns the results in order.
+        The Python++ objects in the items are passed by reference to the worker caches.
+
+        ### Parameters
+        `chunksize`: The number of items sent to a worker at once.
+        Defaults to splitting the items in four chunks per worker, like `multiprocessing.Pool.map`.
+        """
+        items = list(iterable)
+        if chunksize is None:
+            chunksize, extra = divmod(len(items), len(self.workers) * 4)
+            if extra:
+                chunksize += 1
+        chunksize = max(chunksize, 1)
+        chunks = [items[index : index + chunksize] for index in range(0, len(items), chunksize)]
+        results = [None] * len(chunks)
+        byConnection = {worker.connection: worker for worker in self.workers}
+        error = None
+        submitted = 0
+        outstanding = 0
+
+        def submitNext(worker):
+            nonlocal error, submitted, outstanding
+            if error is not None or submitted == len(chunks):
+                return
+            try:
+                self.submit(worker, submitted, function, chunks[submitted])
+            except Exception as submitError:
+                # The chunks already submitted are still received,
+                # so their results do not reach the next call.
+                error = submitError
+                return
+            submitted += 1
+            outstanding += 1
+
+        # Each worker has up to two chunks queued so it does not wait between chunks.
+        for worker in self.workers * 2:
+            submitNext(worker)
+        while outstanding:
+            for connection in multiprocessing.connection.wait(list(byConnection)):
+                index, succeeded, value = connection.recv()
+                outstanding -= 1
+                if succeeded:
+                    results[index] = value
+                elif error is None:
+                    error = value
+                submitNext(byConnection[connection])
+        if error is not None:
+            raise error
+        return [result for chunk in results for result in chunk]
+
+    def close(self):
+        """
+        Stops the worker processes once they are done.
+        """
+        for worker in self.workers:
+            if worker.process.is_alive():
+                worker.connection.send(None)
+        for worker in self.workers:
+            worker.process.join()
+            worker.connection.close()
+        self.workers = []
@@ -0,0 +1,211 @@
+"""
+Allocation and field access counters for Python++ classes.
+Loaded when a class is declared with counters enabled, see `pythonpp.accessCounters`.
+"""
+import collections
+import json
+import threading
+import weakref
+
+__classCounters = collections.OrderedDict()
+
+
+class ThreadShard:
+    """
+    Held by the thread-local storage of a `ThreadCounts` next to the counts of a thread.
+    It is collected when the thread ends, which folds the counts of the thread into the totals.
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+class ThreadCounts:
+    """
+    Counts keyed by name. Every thread increments its own counts,
+    so concurrent increments are never lost, and `totals` adds them up.
+    The counts of threads that ended are added to `base`.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = {}
+        self.base = collections.defaultdict(int)
+
+    def counts(self):
+        # The counts of the current thread, incremented with `counts()[name] += 1`.
+        try:
+            return self.local.counts
+        except AttributeError:
+            counts = collections.defaultdict(int)
+            shard = ThreadShard()
+            with self.lock:
+                self.shards[weakref.ref(shard, self.fold)] = counts
+            self.local.shard = shard
+            self.local.counts = counts
+            return counts
+
+    def fold(self, shard):
+        with self.lock:
+            for name, count in self.shards.pop(shard).items():
+                self.base[name] += count
+
+    def totals(self):
+        with self.lock:
+            totals = collections.defaultdict(int, self.base)
+            for counts in self.shards.values():
+                # Copying a dict does not release the GIL, so the copy is consistent.
+                for name, count in dict(counts).items():
+                    totals[name] += count
+        return dict(totals)
+
+    def clear(self):
+        with self.lock:
+            self.base.clear()
+            for counts in self.shards.values():
+                counts.clear()
+
+
+class ClassCounters:
+    scopes = ("public", "private", "public.static", "private.static")
+
+    def __init__(self):
+        self.instances = ThreadCounts()
+        self.reads = {scope: ThreadCounts() for scope in self.scopes}
+        self.writes = {scope: ThreadCounts() for scope in self.scopes}
+        instances = self.instances.counts
+
+        class Cells(tuple):
+            # The cells of a counted instance live exactly as long as the instance,
+            # so they count its collection without a finalizer per instance.
+            __slots__ = ()
+
+            def __del__(self):
+                instances()["collected"] += 1
+
+        self.Cells = Cells
+
+    def reset(self):
+        for counts in list(self.reads.values()) + list(self.writes.values()):
+            counts.clear()
+
+    def track(self, cells):
+        """
+        Counts a new instance and returns its cells, which count its collection.
+        """
+        self.instances.counts()["created"] += 1
+        return self.Cells(cells)
+
+    def snapshot(self):
+        instances = self.instances.totals()
+        created = instances.get("created", 0)
+        return {
+            "created": created,
+            "alive": created - instances.get("collected", 0),
+            "reads": {scope: counts.totals() for scope, counts in self.reads.items()},
+            "writes": {scope: counts.totals() for scope, counts in self.writes.items()},
+        }
+
+
+def register(cls):
+    """
+    Creates the counters of a Python++ class being decorated.
+    """
+    counters = ClassCounters()
+    __classCounters[cls.__module__ + "." + cls.__qualname__] = counters
+    return counters
+
+
+def counterSnapshot():
+    """
+    Returns the counters of every Python++ class decorated with counters enabled.
+
+    ### Example
+    ```
+    counterSnapshot()
+    # > {'module.MyClass': {'created': 2, 'alive': 1,
+    # >     'reads': {'public': {...}, 'private': {...}, 'public.static': {...}, 'private.static': {...}},
+    # >     'writes': {...}}}
+    ```
+    """
+    return collections.OrderedDict(
+        (name, counters.snapshot()) for name, counters in __classCounters.items()
+    )
+
+
+def resetCounters():
+    """
+    Resets the field access counters of every Python++ class.
+    Instance counts are kept.
+    """
+    for counters in __classCounters.values():
+        counters.reset()
+
+
+def countersToJSON(snapshot=None, **kwargs):
+    """
+    Exports a counter snapshot as JSON.
+
+    ### Parameters
+    `snapshot`: The snapshot to export. Defaults to `counterSnapshot()`.
+    Other keyword arguments are passed to `json.dumps`.
+    """
+    return json.dumps(counterSnapshot() if snapshot is None else snapshot, **kwargs)
+
+
+def __prometheusLabel(value):
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def countersToPrometheus(snapshot=None):
+    """
+    Exports a counter snapshot in the Prometheus text exposition format.
+
+    ### Parameters
+    `snapshot`: The snapshot to export. Defaults to `counterSnapshot()`.
+    """
+    snapshot = counterSnapshot() if snapshot is None else snapshot
+    lines = []
+
+    def metric(name, metricType, description, samples):
+        lines.append("# HELP {name} {description}".format(name=name, description=description))
+        lines.append("# TYPE {name} {metricType}".format(name=name, metricType=metricType))
+        for labels, value in samples:
+            lines.append(
+                "{name}{{{labels}}} {value}".format(
+                    name=name,
+                    labels=",".join(
+                        '{key}="{value}"'.format(key=key, value=__prometheusLabel(label))
+                        for key, label in labels
+                    ),
+                    value=value,
+                )
+            )
+
+    metric(
+        "pythonpp_instances_created_total",
+        "counter",
+        "Python++ instances created.",
+        [((("class", name),), counters["created"]) for name, counters in snapshot.items()],
+    )
+    metric(
+        "pythonpp_instances_alive",
+        "gauge",
+        "Python++ instances currently alive.",
+        [((("class", name),), counters["alive"]) for name, counters in snapshot.items()],
+    )
+    for kind in ("reads", "writes"):
+        metric(
+            "pythonpp_field_{kind}_total".format(kind=kind),
+            "counter",
+            "Python++ field and static {kind}.".format(kind=kind),
+            [
+                ((("class", name), ("scope", scope), ("field", field)), count)
+                for name, counters in snapshot.items()
+                for scope, fields in counters[kind].items()
+                for field, count in sorted(fields.items())
+            ],
+        )
+    return "\n".join(lines) + "\n"
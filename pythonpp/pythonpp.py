@@ -1,19 +1,37 @@
-import functools
-import inspect
-import sys
+import _thread
+import operator
+import os
+import time
 import types
 
+__all__ = [
+    "PythonPP",
+    "accessCounters",
+    "atomicIncrement",
+    "clone",
+    "compareAndSet",
+    "constructor",
+    "encapsulationChecks",
+    "interface",
+    "method",
+    "special",
+    "staticSnapshot",
+    "staticinit",
+    "typeChecks",
+]
+
 __empty = lambda *args, **kwargs: None
-__customConstructor = __empty
-__customStaticinit = __empty
-__publicScope = None
-__privateScope = None
-__bottomLevel = None
 __namespacing = None
-__isStaticContainer = __empty
+__layout = None
 __staticNamespacing = False
+# The objects under construction on the current thread
+# (threading.local without importing threading).
+__construction = _thread._local()
+# Held while a class runs its namespace, which goes through the module globals above.
+__declaring = _thread.RLock()
 __BLACKLIST = {
     "constructor",
+    "interface",
     "method",
     "method",
     "namespace",
@@ -23,6 +41,22 @@ __BLACKLIST = {
     "static",
     "staticinit",
 }
+__typeChecks = (
+    os.environ["PYTHONPP_TYPECHECKS"].lower() in ("1", "true", "yes", "on")
+    if "PYTHONPP_TYPECHECKS" in os.environ
+    else __debug__
+)
+__accessCounters = os.environ.get("PYTHONPP_COUNTERS", "").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+__encapsulationChecks = os.environ.get("PYTHONPP_MODE", "").lower() != "production"
+# Values of namespace local variables that instances can share as long as no method assigns them.
+__IMMUTABLE = frozenset(
+    (type(None), bool, int, float, complex, str, bytes, tuple, frozenset, range)
+)
 
 
 def __parametrized(dec):
@@ -39,20 +73,510 @@ def __is_special(name):
     return name.startswith("__") and name.endswith("__")
 
 
-def __copy_method(f):
+def __makeCell():
+    contents = None
+
+    def setContents(value):
+        nonlocal contents
+        contents = value
+
+    return setContents.__closure__[0], setContents
+
+
+def __rebindCell(cell, cellMap):
+    key = id(cell)
+    if key in cellMap:
+        return cellMap[key]
     try:
-        g = types.FunctionType(
-            f.__code__,
-            f.__globals__,
-            name=f.__name__,
-            argdefs=f.__defaults__,
-            closure=f.__closure__,
+        contents = cell.cell_contents
+    except ValueError:
+        contents = None
+    scopeKey = ("scope", id(contents))
+    if scopeKey in cellMap:
+        cellMap[key] = cellMap[scopeKey]
+    elif isinstance(contents, types.FunctionType) and contents.__closure__:
+        # Register the new cell before rebinding its contents so that
+        # mutually recursive functions end up sharing it.
+        cellMap[key], setContents = __makeCell()
+        setContents(__rebind(contents, cellMap))
+    else:
+        cellMap[key] = cell
+    return cellMap[key]
+
+
+def __rebind(function, cellMap):
+    """
+    Copies a namespace function so that its closure refers to the scopes of another instance.
+    """
+    if not function.__closure__:
+        return function
+    closure = tuple(__rebindCell(cell, cellMap) for cell in function.__closure__)
+    if all(new is old for new, old in zip(closure, function.__closure__)):
+        return function
+    rebound = types.FunctionType(
+        function.__code__,
+        function.__globals__,
+        function.__name__,
+        function.__defaults__,
+        closure,
+    )
+    rebound.__kwdefaults__ = function.__kwdefaults__
+    rebound.__qualname__ = function.__qualname__
+    rebound.__dict__.update(function.__dict__)
+    return rebound
+
+
+def __scopeCellMap(scopes, cells, localCells=()):
+    """
+    Returns the cell map `__rebind` uses to move functions from `scopes` to the scopes held by `cells`.
+    The local variables held by `localCells` move to the cells following the scopes.
+    """
+    cellMap = {("scope", id(scope)): cell for scope, cell in zip(scopes, cells)}
+    cellMap.update(zip(map(id, localCells), cells[2:]))
+    return cellMap
+
+
+def __refersTo(contents, scopes, seen, localIndices):
+    if any(contents is scope for scope in scopes):
+        return True
+    if not isinstance(contents, types.FunctionType) or id(contents) in seen:
+        return False
+    seen.add(id(contents))
+    for cell in contents.__closure__ or ():
+        if id(cell) in localIndices:
+            return True
+        try:
+            if __refersTo(cell.cell_contents, scopes, seen, localIndices):
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+def __writesCells(code):
+    # Whether the code assigns variables of enclosing functions, e.g. with `nonlocal`.
+    import opcode
+
+    writes = {opcode.opmap["STORE_DEREF"], opcode.opmap["DELETE_DEREF"]}
+    if any(operation in writes for operation in code.co_code[::2]):
+        return True
+    return any(
+        isinstance(constant, types.CodeType) and __writesCells(constant)
+        for constant in code.co_consts
+    )
+
+
+def __localCells(functions, scopes, names):
+    """
+    Returns the cells holding the local variables of the namespace that its functions use
+    and that every instance needs its own copy of, e.g. `count` in `count = 0` and a method using `nonlocal count`,
+    or `log` in `log = []` and a method appending to it.
+    These are the variables the functions assign and the variables holding mutable values.
+    `names` are the local variables of the namespaces; cells holding scopes or functions are not copied.
+    Every cell comes with its path in `functions` for `__cellAt`.
+    """
+    cells = {}
+    pending = [(function, (index,)) for index, function in enumerate(functions)]
+    pending.reverse()
+    seen = set()
+    while pending:
+        function, path = pending.pop()
+        if id(function) in seen:
+            continue
+        seen.add(id(function))
+        writes = None
+        closure = zip(function.__code__.co_freevars, function.__closure__ or ())
+        for index, (name, cell) in enumerate(closure):
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                contents = None
+            if any(contents is scope for scope in scopes):
+                continue
+            if isinstance(contents, types.FunctionType):
+                pending.append((contents, path + (index,)))
+            elif name in names and id(cell) not in cells:
+                if type(contents) not in __IMMUTABLE:
+                    cells[id(cell)] = (cell, path + (index,))
+                    continue
+                if writes is None:
+                    writes = __writesCells(function.__code__)
+                if writes:
+                    cells[id(cell)] = (cell, path + (index,))
+    return list(cells.values())
+
+
+def __cellAt(functions, path):
+    """
+    Returns the cell at `path` in `functions`, as returned by `__localCells`.
+    """
+    function = functions[path[0]]
+    for index in path[1:-1]:
+        function = function.__closure__[index].cell_contents
+    return function.__closure__[path[-1]]
+
+
+def __binder(function, scopes, localCells=()):
+    """
+    Returns a function that binds a namespace function to an instance.
+    The binder takes the cells holding the public and private scopes of the instance,
+    followed by the copies of `localCells`, and returns a copy of `function`
+    whose closure refers to them instead of `scopes`.
+    """
+    closure = function.__closure__ or ()
+    localIndices = {id(cell): 2 + index for index, cell in enumerate(localCells)}
+    indices = []
+    fixed = []
+    for cell in closure:
+        try:
+            contents = cell.cell_contents
+        except ValueError:
+            contents = None
+        if id(cell) in localIndices:
+            indices.append(localIndices[id(cell)])
+        elif contents is scopes[0]:
+            indices.append(0)
+        elif contents is scopes[1]:
+            indices.append(1)
+        elif __refersTo(contents, scopes, set(), localIndices):
+            # The function calls other namespace functions directly,
+            # so these have to be rebound as well.
+            return lambda cells: __rebind(
+                function, __scopeCellMap(scopes, cells, localCells)
+            )
+        else:
+            indices.append(2 + len(localCells) + len(fixed))
+            fixed.append(cell)
+
+    if len(fixed) == len(indices):
+        return lambda cells: function
+    if function.__kwdefaults__ or function.__dict__:
+        return lambda cells: __rebind(function, __scopeCellMap(scopes, cells, localCells))
+
+    code = function.__code__
+    globs = function.__globals__
+    name = function.__name__
+    defaults = function.__defaults__
+    fixed = tuple(fixed)
+    getCells = operator.itemgetter(*indices)
+    newFunction = types.FunctionType
+
+    if len(indices) == 1:
+        return lambda cells: newFunction(
+            code, globs, name, defaults, (getCells(cells + fixed),)
         )
-        g = functools.update_wrapper(g, f)
-        g.__kwdefaults__ = f.__kwdefaults__
+    return lambda cells: newFunction(code, globs, name, defaults, getCells(cells + fixed))
+
+
+def __constructionStack():
+    try:
+        return __construction.stack
     except AttributeError:
-        return __empty
-    return g
+        __construction.stack = []
+        return __construction.stack
+
+
+class __StaticState:
+    """
+    Synchronizes the writes to the static variables of a Python++ class.
+    Writers hold `lock` and make `version` odd while they write, so readers can
+    take consistent snapshots without locking.
+    """
+
+    __slots__ = ("lock", "version")
+
+    def __init__(self):
+        self.lock = _thread.RLock()
+        self.version = 0
+
+
+def __staticState(scope):
+    try:
+        state = object.__getattribute__(scope, "__staticstate__")
+    except AttributeError:
+        state = None
+    if not isinstance(state, __StaticState):
+        raise TypeError(
+            "Expected a static scope, either public.static or private.static."
+        )
+    return state
+
+
+class __MethodDescriptor:
+    """
+    The base of the descriptors binding the methods of classes declared without encapsulation checks.
+    """
+
+    __slots__ = ()
+
+
+class __Layout:
+    """
+    The members declared in the namespaces of a Python++ class and its bases,
+    collected once when the class is decorated.
+    """
+
+    def __init__(self, public, private):
+        self.scopes = (public, private)
+        self.methods = {"public": {}, "private": {}}
+        self.abstract = {"public": set(), "private": set()}
+        self.variables = {"public": {}, "private": {}}
+        self.constructors = {}
+        self.specials = {}
+
+
+# The lines of the source files of namespaces, with the size and modification time they were read at.
+__sources = {}
+
+
+def __sourceLines(filename):
+    """
+    Returns the lines of a source file, read again only when its size or modification time changed.
+    Like `linecache`, which is not used because importing it imports `tokenize` and `re`.
+    Raises OSError if the file cannot be read.
+    """
+    stat = os.stat(filename)
+    version = (stat.st_size, stat.st_mtime_ns)
+    cached = __sources.get(filename)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with open(filename, encoding="utf-8", errors="replace") as file:
+        lines = file.readlines()
+    __sources[filename] = (version, lines)
+    return lines
+
+
+def __lastLine(code):
+    if hasattr(code, "co_lines"):
+        last = max(
+            (line for _, _, line in code.co_lines() if line is not None),
+            default=code.co_firstlineno,
+        )
+    else:
+        line = last = code.co_firstlineno
+        for delta in code.co_lnotab[1::2]:
+            line += delta - 256 if delta >= 128 else delta
+            last = max(last, line)
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            last = max(last, __lastLine(constant))
+    return last
+
+
+def __annotatesAttribute(line, name):
+    # Whether the line contains `name.attribute:`, e.g. `public.level: int`.
+    prefix = name + "."
+    start = line.find(prefix)
+    while start != -1:
+        end = start + len(prefix)
+        if start == 0 or not (line[start - 1].isalnum() or line[start - 1] in "_."):
+            attribute = end
+            while attribute < len(line) and (
+                line[attribute].isalnum() or line[attribute] == "_"
+            ):
+                attribute += 1
+            rest = line[attribute:].lstrip()
+            if attribute > end and rest.startswith(":") and not rest.startswith(":="):
+                return True
+        start = line.find(prefix, end)
+    return False
+
+
+def __declaresFields(namespace):
+    """
+    Returns whether a namespace may declare typed fields, with a plain text search of its lines.
+    Parsing the declarations needs `codegen`, which is only loaded for the namespaces that may have some.
+    """
+    code = namespace.__code__
+    try:
+        lines = __sourceLines(code.co_filename)
+    except OSError:
+        # The source may still be available to `inspect`, e.g. from a loader.
+        return True
+    names = code.co_varnames[: code.co_argcount]
+    return any(
+        __annotatesAttribute(line, name)
+        for line in lines[code.co_firstlineno - 1 : __lastLine(code)]
+        for name in names
+    )
+
+
+def typeChecks(enabled):
+    """
+    Enables or disables field type checking for Python++ classes decorated afterwards.
+    Type checking is enabled by default unless Python runs with `-O`,
+    and can also be set with the `PYTHONPP_TYPECHECKS` environment variable.
+    Classes decorated while type checking is disabled carry no validation code at all.
+
+    ### Example
+    ```
+    typeChecks(False)
+
+    @PythonPP
+    class MyClass:
+        def namespace(public, private):
+            private.level: int # not validated
+    ```
+
+    ### Parameters
+    `enabled`: Whether field declarations are validated.
+    """
+    global __typeChecks
+    __typeChecks = bool(enabled)
+
+
+def accessCounters(enabled):
+    """
+    Enables or disables allocation and field access counters for Python++ classes decorated afterwards.
+    Counters are disabled by default and can also be enabled with the `PYTHONPP_COUNTERS` environment variable.
+    Classes decorated while counters are disabled carry no counting code at all.
+
+    ### Example
+    ```
+    accessCounters(True)
+
+    @PythonPP
+    class MyClass:
+        def namespace(public, private):
+            pass # accesses to MyClass instances and statics are counted
+    ```
+
+    ### Parameters
+    `enabled`: Whether accesses are counted.
+    """
+    global __accessCounters
+    __accessCounters = bool(enabled)
+
+
+def encapsulationChecks(enabled):
+    """
+    Enables or disables the encapsulation checks of Python++ classes decorated afterwards.
+    Checks are enabled by default and can also be disabled by setting the `PYTHONPP_MODE`
+    environment variable to `production`, or per class with `@PythonPP(checks=False)`.
+
+    Classes declared without checks have no per-access hooks: public variables and methods
+    are plain attributes, and private variables live in a separate object that is only reachable
+    through the namespace. Static variables can be read from instances,
+    the scopes do not check variable names, and clones never share their private variables.
+
+    ### Example
+    ```
+    encapsulationChecks(False)
+
+    @PythonPP
+    class MyClass:
+        def namespace(public, private):
+            pass # MyClass runs without encapsulation checks
+    ```
+
+    ### Parameters
+    `enabled`: Whether encapsulation is checked.
+    """
+    global __encapsulationChecks
+    __encapsulationChecks = bool(enabled)
+
+
+def atomicIncrement(scope, name, delta=1):
+    """
+    Atomically adds `delta` to a static variable and returns the new value.
+    Only writes through the static scopes are synchronized with it;
+    assignments to the class itself, e.g. `MyClass.lastId = 0`, bypass the lock.
+
+    ### Example
+    ```
+    @method(public.static)
+    def nextId():
+        return atomicIncrement(private.static, "lastId")
+    ```
+
+    ### Parameters
+    `scope`: The static scope, either `public.static` or `private.static`.
+
+    `name`: The name of the static variable.
+
+    `delta`: The value added to the static variable.
+    """
+    with __staticState(scope).lock:
+        value = getattr(scope, name) + delta
+        setattr(scope, name, value)
+    return value
+
+
+def compareAndSet(scope, name, expected, value):
+    """
+    Atomically sets a static variable to `value` if it is equal to `expected`.
+    Returns whether the static variable was set.
+    Like `atomicIncrement`, it is only atomic with respect to writes through the static scopes.
+
+    ### Example
+    ```
+    @method(public.static)
+    def open():
+        return compareAndSet(private.static, "state", "closed", "open")
+    ```
+
+    ### Parameters
+    `scope`: The static scope, either `public.static` or `private.static`.
+
+    `name`: The name of the static variable.
+    """
+    with __staticState(scope).lock:
+        if getattr(scope, name) != expected:
+            return False
+        setattr(scope, name, value)
+    return True
+
+
+def staticSnapshot(scope):
+    """
+    Returns a consistent copy of the static variables of a scope, keyed by name.
+    Reading never waits for a lock; the copy is taken again if a write happens meanwhile.
+    Assignments to the class itself, e.g. `MyClass.state = "open"`, are not seen as writes.
+    Static methods are not included.
+
+    ### Parameters
+    `scope`: The static scope, either `public.static` or `private.static`.
+    """
+    global __BLACKLIST
+    state = __staticState(scope)
+    variables = vars(object.__getattribute__(scope, "container"))
+    while True:
+        version = state.version
+        if version % 2 == 0:
+            snapshot = {
+                name: value
+                for name, value in list(variables.items())
+                if not (
+                    __is_special(name)
+                    or name in __BLACKLIST
+                    or isinstance(value, (types.FunctionType, __MethodDescriptor))
+                )
+            }
+            if state.version == version:
+                return snapshot
+        time.sleep(0)
+
+
+def clone(instance, copyOnWrite=False):
+    """
+    Clones a Python++ object without running its namespace or constructor.
+    The public and private variables are copied shallowly, like `copy.copy`.
+    `copy.copy` and `copy.deepcopy` are also supported.
+
+    ### Example
+    ```
+    template = MyClass("template")
+    obj = clone(template)
+    obj.setName("copy") # does not affect template
+    ```
+
+    ### Parameters
+    `instance`: The Python++ object to clone.
+
+    `copyOnWrite`: Whether the clone shares the private variables of `instance`
+    until either object assigns a private variable.
+    """
+    return type(instance).__clone__(instance, copyOnWrite=copyOnWrite)
 
 
 def constructor(func):
@@ -68,8 +592,10 @@ def constructor(func):
                 private.variable = parameter
     ```
     """
-    global __customConstructor
-    __customConstructor = func
+    global __layout, __namespacing
+
+    if __layout is not None:
+        __layout.constructors[__namespacing] = func
 
 
 def staticinit(func):
@@ -105,7 +631,7 @@ def special(func):
     ```
     """
 
-    global __namespacing
+    global __layout
 
     if not __is_special(func.__name__):
         raise AttributeError(
@@ -115,19 +641,12 @@ def special(func):
             ).format(methodName=func.__name__)
         )
 
-    def getReplacement(theMethod):
-        def replacementInternal(self, *args, **kwargs):
-            return theMethod(*args, **kwargs)
-
-        return replacementInternal
-
-    setattr(
-        __namespacing, func.__name__, getReplacement(func),
-    )
+    if __layout is not None:
+        __layout.specials[func.__name__] = func
 
 
 @__parametrized
-def method(func, scope):
+def method(func, scope, abstract=False):
     """
     The method decorator for Python++ classes.
 
@@ -153,8 +672,11 @@ def method(func, scope):
     ### Parameters
     `scope`: The method scope.
     Either `public`, `private`, `public.static`, or `private.static`.
+
+    `abstract`: Declares the method without an implementation.
+    Classes with unimplemented abstract methods cannot be instantiated.
     """
-    global __namespacing, __BLACKLIST
+    global __namespacing, __layout, __BLACKLIST
     if func.__name__ in __BLACKLIST:
         raise AttributeError(
             'Methods cannot be named "{funcname}".'.format(funcname=func.__name__)
@@ -172,7 +694,21 @@ def method(func, scope):
                 + "Such method names are reserved for special methods created with @special."
             ).format(funcname=func.__name__)
         )
-    if not __isStaticContainer(scope):
+    if __layout is not None and scope in __layout.scopes:
+        scopeName = "public" if scope is __layout.scopes[0] else "private"
+        if abstract:
+            __layout.methods[scopeName].pop(func.__name__, None)
+            __layout.abstract[scopeName].add(func.__name__)
+        else:
+            __layout.methods[scopeName][func.__name__] = func
+            __layout.abstract[scopeName].discard(func.__name__)
+    elif abstract:
+        raise AttributeError(
+            'The static method "{funcname}" cannot be abstract.'.format(
+                funcname=func.__name__
+            )
+        )
+    else:
         try:
             setattr(scope, func.__name__, func)
         except AttributeError:
@@ -184,7 +720,25 @@ def method(func, scope):
     return inner
 
 
-def PythonPP(cls):
+def __interfaceInit(self, *args, **kwargs):
+    raise TypeError(
+        'The interface "{name}" cannot be instantiated.'.format(
+            name=type(self).__qualname__
+        )
+    )
+
+
+def __finalInitSubclass(cls, **kwargs):
+    for base in cls.__mro__[1:]:
+        if base.__dict__.get("__final__"):
+            raise TypeError(
+                'The final class "{name}" cannot be subclassed.'.format(
+                    name=base.__qualname__
+                )
+            )
+
+
+def PythonPP(cls=None, final=False, checks=None):
     """
     The class decorator for Python++ classes.
 
@@ -194,52 +748,281 @@ def PythonPP(cls):
     class MyClass:
         def namespace(public, private):
             pass # Methods and variables here
+
+    @PythonPP(final=True)
+    class MyFinalClass(MyClass):
+        def namespace(public, private):
+            pass # Methods and variables here
+    ```
+
+    ### Parameters
+    `final`: Forbids subclassing the class.
+    Final classes must implement every abstract method and call their methods without virtual dispatch.
+
+    `checks`: Whether encapsulation is checked, see `encapsulationChecks`.
+    Defaults to the global setting.
+    """
+    if cls is None:
+        return lambda cls: __declare(cls, final, False, checks)
+    return __declare(cls, final, False, checks)
+
+
+def interface(cls):
+    """
+    The class decorator for Python++ interfaces.
+    Interfaces only declare abstract public methods and cannot be instantiated.
+
+    ### Example
+    ```
+    @interface
+    class Shape:
+        def namespace(public, private):
+            @method(public, abstract=True)
+            def area():
+                pass
+
+    @PythonPP
+    class Square(Shape):
+        def namespace(public, private):
+            @constructor
+            def Square(side):
+                private.side = side
+
+            @method(public)
+            def area():
+                return private.side ** 2
     ```
     """
-    global __BLACKLIST, __staticNamespacing
+    return __declare(cls, False, True, None)
+
+
+def __declare(cls, final, interface, checks):
+    global __BLACKLIST, __layout, __staticNamespacing
+
+    if checks is None:
+        checks = __encapsulationChecks
 
     # Adding stuff to the current scope to speed up lookup times
     globs = globals
+    isSpecial = __is_special
+    rebind = __rebind
+    StaticState = __StaticState
+    newCell = types.CellType
+    constructionStack = __constructionStack
+    sameValue = lambda value: value
+
+    # Methods are bound to an instance when they are looked up.
+    publicBinders = {}
+    privateBinders = {}
+    constructorBinders = {}
+    publicInitializers = []
+    privateInitializers = []
+    # The cells of the local variables of the namespace that every instance has its own copy of,
+    # and their paths in the functions of a namespace run.
+    localCells = ()
+    localPaths = ()
 
     class Container:
         pass
 
-    class Scope:
-        def __init__(self, instance, static):
-            object.__setattr__(self, "instance", instance)
-            object.__setattr__(self, "static", static)
+    class Store:
+        # The private scope of an instance when encapsulation is not checked.
+        # Private methods are bound by the class, like the public ones on `cls`.
+        pass
 
-        def __getattribute__(self, name):
-            if name == "static":
-                return object.__getattribute__(self, "static")
-            if object.__getattribute__(self, "instance") is None:
+    class Method(__MethodDescriptor):
+        # Binds a method to the instance it is looked up on, without per-access hooks.
+        __slots__ = ("bind",)
+
+        def __init__(self, bind):
+            self.bind = bind
+
+        def __get__(self, instance, owner=None):
+            if instance is None:
+                return self
+            return self.bind(stateOf(instance))
+
+    def scopeClass(binders, virtual=False):
+        class Scope:
+            __slots__ = ("instance", "static", "cells", "copyOnWrite")
+
+            def __init__(self, instance, static, cells=None):
+                object.__setattr__(self, "instance", instance)
+                object.__setattr__(self, "static", static)
+                object.__setattr__(self, "cells", cells)
+                object.__setattr__(self, "copyOnWrite", None)
+
+            def __getattribute__(self, name):
+                if name == "static":
+                    return object.__getattribute__(self, "static")
+                instance = object.__getattribute__(self, "instance")
+                if instance is None:
+                    raise AttributeError(
+                        "The variable or method cannot be retrieved because the instance scope is empty."
+                    )
+                bind = binders.get(name)
+                if bind is not None and (
+                    not virtual
+                    or type(instance) is cls
+                    or name not in overriddenBy(type(instance))
+                ):
+                    return bind(object.__getattribute__(self, "cells"))
+                return object.__getattribute__(instance, name)
+
+            def __setattr__(self, name, value):
+                if name in globs()["__BLACKLIST"]:
+                    raise AttributeError(
+                        'Methods and variables cannot be named "{name}".'.format(
+                            name=name
+                        )
+                    )
+                if object.__getattribute__(self, "instance") is None:
+                    raise AttributeError(
+                        "The variable or method cannot be created because the instance scope is empty."
+                    )
+                object.__setattr__(
+                    object.__getattribute__(self, "instance"), name, value
+                )
+
+        return Scope
+
+    def typedScope(base, validators):
+        if not validators:
+            return base
+
+        class TypedScope(base):
+            __slots__ = ()
+
+            def __setattr__(self, name, value):
+                validator = validators.get(name)
+                if validator is not None:
+                    validator(value)
+                super().__setattr__(name, value)
+
+        return TypedScope
+
+    def countedScope(base, reads, writes):
+        class CountedScope(base):
+            __slots__ = ()
+
+            def __getattribute__(self, name):
+                if name != "static" and not isSpecial(name):
+                    reads()[name] += 1
+                return super().__getattribute__(name)
+
+            def __setattr__(self, name, value):
+                writes()[name] += 1
+                super().__setattr__(name, value)
+
+        return CountedScope
+
+    if __typeChecks and any(
+        __declaresFields(base.namespace)
+        for base in cls.__mro__
+        if "namespace" in base.__dict__
+    ):
+        from . import codegen
+
+        publicValidators, privateValidators = codegen.compileValidators(cls)
+    else:
+        publicValidators, privateValidators = {}, {}
+    PublicScope = typedScope(scopeClass(publicBinders, not final), publicValidators)
+    PrivateScope = typedScope(scopeClass(privateBinders), privateValidators)
+
+    def templateScope(scopeName, validators):
+        class TemplateScope:
+            # The scope passed to the namespace when the class is decorated.
+            # Variables assigned in the bare namespace become initial values of every instance.
+            __slots__ = ("static",)
+
+            def __init__(self, static):
+                object.__setattr__(self, "static", static)
+
+            def __getattribute__(self, name):
+                if name == "static":
+                    return object.__getattribute__(self, "static")
+                variables = globs()["__layout"].variables[scopeName]
+                if name in variables:
+                    return variables[name]
                 raise AttributeError(
                     "The variable or method cannot be retrieved because the instance scope is empty."
                 )
-            return object.__getattribute__(
-                object.__getattribute__(self, "instance"), name
-            )
+
+            def __setattr__(self, name, value):
+                if name in globs()["__BLACKLIST"]:
+                    raise AttributeError(
+                        'Methods and variables cannot be named "{name}".'.format(
+                            name=name
+                        )
+                    )
+                validator = validators.get(name)
+                if validator is not None:
+                    validator(value)
+                globs()["__layout"].variables[scopeName][name] = value
+
+        return TemplateScope
+
+    counters = None
+    if __accessCounters:
+        from . import profiling
+
+        counters = profiling.register(cls)
+        PublicScope = countedScope(
+            PublicScope,
+            counters.reads["public"].counts,
+            counters.writes["public"].counts,
+        )
+        PrivateScope = countedScope(
+            PrivateScope,
+            counters.reads["private"].counts,
+            counters.writes["private"].counts,
+        )
+
+    class CopyOnWriteScope(PrivateScope):
+        # A private scope sharing the private store of another instance.
+        # The first write copies the store and turns it back into a PrivateScope.
+        __slots__ = ()
+
+        def __getattribute__(self, name):
+            value = super().__getattribute__(name)
+            cellMap, rebound = object.__getattribute__(self, "copyOnWrite")
+            if (
+                cellMap is None
+                or name in privateBinders
+                or not isinstance(value, types.FunctionType)
+            ):
+                return value
+            if name not in rebound:
+                rebound[name] = rebind(value, cellMap)
+            return rebound[name]
 
         def __setattr__(self, name, value):
-            if name in globs()["__BLACKLIST"]:
-                raise AttributeError(
-                    'Methods and variables cannot be named "{name}".'.format(name=name)
-                )
-            if object.__getattribute__(self, "instance") is None:
-                raise AttributeError(
-                    "The variable or method cannot be created because the instance scope is empty."
-                )
-            object.__setattr__(object.__getattribute__(self, "instance"), name, value)
+            detach(self)
+            PrivateScope.__setattr__(self, name, value)
+
+    def detach(scope):
+        cellMap, _ = object.__getattribute__(scope, "copyOnWrite")
+        store = object.__getattribute__(scope, "instance")
+        object.__setattr__(scope, "instance", copyStore(store, sameValue, cellMap))
+        object.__setattr__(scope, "copyOnWrite", None)
+        object.__setattr__(scope, "__class__", PrivateScope)
 
     class ContainerWrapper:
         def __init__(self, container):
             object.__setattr__(self, "container", container)
+            object.__setattr__(self, "__staticstate__", StaticState())
 
         def __getattribute__(self, name):
             return getattr(object.__getattribute__(self, "container"), name)
 
         def __setattr__(self, name, value):
-            return setattr(object.__getattribute__(self, "container"), name, value)
+            state = object.__getattribute__(self, "__staticstate__")
+            with state.lock:
+                state.version += 1
+                try:
+                    setattr(object.__getattribute__(self, "container"), name, value)
+                finally:
+                    state.version += 1
 
     def blockStatic(name):
         permitted = __is_special(name)
@@ -251,104 +1034,478 @@ def PythonPP(cls):
             )
 
     class StaticContainerWrapper(ContainerWrapper):
+        pass
+
+    def countedStaticContainerWrapper(reads, writes):
+        class CountedStaticContainerWrapper(StaticContainerWrapper):
+            def __getattribute__(self, name):
+                reads()[name] += 1
+                return super().__getattribute__(name)
+
+            def __setattr__(self, name, value):
+                writes()[name] += 1
+                return super().__setattr__(name, value)
+
+        return CountedStaticContainerWrapper
+
+    if counters is None:
+        PublicStaticWrapper = PrivateStaticWrapper = StaticContainerWrapper
+    else:
+        PublicStaticWrapper = countedStaticContainerWrapper(
+            counters.reads["public.static"].counts,
+            counters.writes["public.static"].counts,
+        )
+        PrivateStaticWrapper = countedStaticContainerWrapper(
+            counters.reads["private.static"].counts,
+            counters.writes["private.static"].counts,
+        )
+
+    static_private_scope = PrivateStaticWrapper(Container())
+    static_public_scope = PublicStaticWrapper(cls)
+
+    def namespacedClasses():
+        return [
+            theClass
+            for theClass in reversed(cls.__mro__)
+            if "namespace" in theClass.__dict__
+        ]
+
+    def recursivelyInitNamespace(public, private):
+        global __namespacing
+        namespacing = __namespacing
+        try:
+            for theClass in namespacedClasses():
+                __namespacing = theClass
+                theClass.namespace(public, private)
+        finally:
+            __namespacing = namespacing
+
+    class StaticReader:
+        # The static scopes of the namespace runs of instances.
+        # Static variables and methods are only set when the class is declared.
+        __slots__ = ("scope",)
+
+        def __init__(self, scope):
+            object.__setattr__(self, "scope", scope)
+
         def __getattribute__(self, name):
-            if (globs()["__bottomLevel"] is not None) and not globs()[
-                "__staticNamespacing"
-            ]:
-                return
-            return super().__getattribute__(name)
+            return getattr(object.__getattribute__(self, "scope"), name)
 
         def __setattr__(self, name, value):
-            if (globs()["__bottomLevel"] is not None) and not globs()[
-                "__staticNamespacing"
-            ]:
-                return
-            return super().__setattr__(name, value)
+            pass
 
-    static_private_scope = StaticContainerWrapper(Container())
-    static_public_scope = StaticContainerWrapper(cls)
+    def layoutFunctions(layout):
+        return [
+            function
+            for members in (
+                layout.methods["public"],
+                layout.methods["private"],
+                layout.variables["public"],
+                layout.variables["private"],
+                layout.constructors,
+                layout.specials,
+            )
+            for function in members.values()
+            if isinstance(function, types.FunctionType)
+        ]
 
-    def getStaticConstructor(theClass):
-        def static_constructor(*args, **kwargs):
-            nonlocal static_public_scope
-            theClass.__init__(static_public_scope, *args, **kwargs)
+    def namespaceLocals():
+        # Runs the namespace again, as it ran for every instance before methods were stored per class,
+        # and returns the cells of its local variables.
+        global __layout
+        layout = __Layout(
+            templateScope("public", publicValidators)(StaticReader(static_public_scope)),
+            templateScope("private", privateValidators)(
+                StaticReader(static_private_scope)
+            ),
+        )
+        with __declaring:
+            declaring = __layout
+            __layout = layout
+            try:
+                recursivelyInitNamespace(*layout.scopes)
+            finally:
+                __layout = declaring
+        functions = layoutFunctions(layout)
+        return tuple([__cellAt(functions, path) for path in localPaths])
 
-        return static_constructor
+    def newInstance(self):
+        if checks:
+            store = Container()
+            publicScope = PublicScope(self, static_public_scope)
+            privateScope = PrivateScope(store, static_private_scope)
+            cells = (newCell(publicScope), newCell(privateScope))
+        else:
+            # The instance and its store are the scopes themselves.
+            store = Store()
+            cells = (newCell(self), newCell(store))
+        if localPaths:
+            cells += namespaceLocals()
+        if counters is not None:
+            cells = counters.track(cells)
+        if checks:
+            object.__setattr__(publicScope, "cells", cells)
+            object.__setattr__(privateScope, "cells", cells)
+        else:
+            object.__setattr__(store, "__pythonpp__", cells)
+        object.__setattr__(self, "__pythonpp__", cells)
+        for name, initialize in publicInitializers:
+            object.__setattr__(self, name, initialize(cells))
+        for name, initialize in privateInitializers:
+            object.__setattr__(store, name, initialize(cells))
+        return cells
 
-    def recursivelyInitNamespace(public, private):
-        global __namespacing, __customConstructor
-        for base in cls.__bases__:
-            if hasattr(base, "namespace"):
-                __namespacing = base
-                base.constructor = getStaticConstructor(base)
-                base.namespace(public, private)
-                __namespacing = None
-                __customConstructor = __empty
-        __namespacing = cls
-        cls.namespace(public, private)
-        __namespacing = None
-
-    def isStaticContainer(scope):
-        return isinstance(scope, StaticContainerWrapper)
+    def storeOf(privateScope):
+        if checks:
+            return object.__getattribute__(privateScope, "instance")
+        return privateScope
 
-    def __init__(self, *args, **kwargs):
-        global __customConstructor, __publicScope, __privateScope, __bottomLevel, __namespacing, __isStaticContainer
-        nonlocal static_public_scope, static_private_scope, isStaticContainer
+    def stateOf(self):
+        try:
+            return object.__getattribute__(self, "__pythonpp__")
+        except AttributeError:
+            # e.g. objects created by pickle without calling __init__
+            return newInstance(self)
+
+    def construct(theClass, cells, args, kwargs):
+        bind = constructorBinders.get(theClass)
+        if bind is None:
+            return
+        stack = constructionStack()
+        stack.append((cells, constructorBinders))
+        try:
+            bind(cells)(*args, **kwargs)
+        finally:
+            stack.pop()
+
+    def callConstructor(*args, **kwargs):
+        stack = constructionStack()
+        if not stack:
+            raise AttributeError(
+                'The constructor of "{name}" can only be called from a constructor.'.format(
+                    name=cls.__qualname__
+                )
+            )
+        cells, binders = stack[-1]
+        bind = binders.get(cls) or constructorBinders.get(cls)
+        if bind is not None:
+            bind(cells)(*args, **kwargs)
+
+    def specialMethod(bind):
+        def replacementInternal(self, *args, **kwargs):
+            return bind(stateOf(self))(*args, **kwargs)
+
+        return replacementInternal
+
+    overrides = {}
+
+    def overriddenBy(theClass):
+        # The names defined by subclasses that are not Python++ classes,
+        # resolved once per subclass.
+        names = overrides.get(theClass)
+        if names is None:
+            mro = theClass.__mro__
+            names = overrides[theClass] = frozenset(
+                name for base in mro[: mro.index(cls)] for name in base.__dict__
+            )
+        return names
+
+    def __getattribute__(self, name):
+        bind = publicBinders.get(name)
+        if bind is not None and (
+            type(self) is cls or name not in overriddenBy(type(self))
+        ):
+            return bind(stateOf(self))
+        blockStatic(name)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        blockStatic(name)
+        return object.__setattr__(self, name, value)
+
+    if publicValidators:
+        uncheckedSetattr = __setattr__
+
+        def __setattr__(self, name, value):
+            validator = publicValidators.get(name)
+            if validator is not None:
+                validator(value)
+            return uncheckedSetattr(self, name, value)
 
-        if __bottomLevel is None:
-            __publicScope = Scope(self, static_public_scope)
-            __privateScope = Scope(ContainerWrapper(Container()), static_private_scope)
-            __bottomLevel = cls
-            __isStaticContainer = isStaticContainer
-            __customConstructor = __empty
-        recursivelyInitNamespace(__publicScope, __privateScope)
+    def countedHooks(scopeName, uncountedGetattribute, uncountedSetattr):
+        reads = counters.reads[scopeName].counts
+        writes = counters.writes[scopeName].counts
 
         def __getattribute__(self, name):
-            blockStatic(name)
-            # copied_get_attribute(self, name)
-            return object.__getattribute__(self, name)
+            if not isSpecial(name):
+                reads()[name] += 1
+            return uncountedGetattribute(self, name)
 
         def __setattr__(self, name, value):
-            blockStatic(name)
-            return object.__setattr__(self, name, value)
+            writes()[name] += 1
+            return uncountedSetattr(self, name, value)
 
-        if __customConstructor is __empty:
-            pass
+        return __getattribute__, __setattr__
+
+    if counters is not None:
+        __getattribute__, __setattr__ = countedHooks(
+            "public", __getattribute__, __setattr__
+        )
+
+    def __init__(self, *args, **kwargs):
+        construct(cls, newInstance(self), args, kwargs)
+
+    def validatingSetattr(validators):
+        def __setattr__(self, name, value):
+            validator = validators.get(name)
+            if validator is not None:
+                validator(value)
+            object.__setattr__(self, name, value)
+
+        return __setattr__
+
+    def copyFields(fields, copyValue, cellMap):
+        copied = {}
+        for name, value in fields.items():
+            if name == "__pythonpp__":
+                continue
+            if isinstance(value, types.FunctionType):
+                copied[name] = value if cellMap is None else rebind(value, cellMap)
+            else:
+                copied[name] = copyValue(value)
+        return copied
+
+    def copyStore(store, copyValue, cellMap):
+        copied = object.__new__(type(store))
+        copied.__dict__.update(copyFields(store.__dict__, copyValue, cellMap))
+        return copied
+
+    def cloneInstance(self, copyOnWrite=False, memo=None):
+        cells = stateOf(self)
+        publicScope, privateScope = cells[0].cell_contents, cells[1].cell_contents
+        store = storeOf(privateScope)
+        if memo is None:
+            copyValue = sameValue
         else:
-            __customConstructor(*args, **kwargs)
+            import copy
 
-        if cls == __bottomLevel:
-            __publicScope = None
-            __privateScope = None
-            __bottomLevel = None
-            __isStaticContainer = __empty
+            copyValue = lambda value: copy.deepcopy(value, memo)
 
-        cls.__getattribute__ = __getattribute__
-        cls.__setattr__ = __setattr__
+        clone = object.__new__(type(self))
+        if memo is not None:
+            memo[id(self)] = clone
+        cloneCells = newInstance(clone)
+        clonePrivateScope = cloneCells[1].cell_contents
+        for cell, cloneCell in zip(cells[2:], cloneCells[2:]):
+            try:
+                cloneCell.cell_contents = copyValue(cell.cell_contents)
+            except ValueError:
+                pass
+        # Functions stored in the variables are rebound to the clone.
+        cellMap = __scopeCellMap((publicScope, privateScope), cloneCells, cells[2:])
+        shared = object.__getattribute__(privateScope, "copyOnWrite") if checks else None
+        if shared is not None and shared[0] is not None:
+            # Functions in a shared store are bound to the scopes of the instance
+            # that owned the store first, which may not be the one being cloned.
+            positions = {id(cell): index for index, cell in enumerate(cells)}
+            for key, cell in list(shared[0].items()):
+                if isinstance(key, tuple):
+                    cellMap[key] = cellMap[("scope", id(cell.cell_contents))]
+                elif id(cell) in positions:
+                    cellMap[key] = cloneCells[positions[id(cell)]]
 
-        for base in cls.__bases__:
-            if hasattr(base, "constructor"):
-                del base.constructor
+        if not checks:
+            # Without checks the private scope is the store itself, so it is never shared.
+            object.__getattribute__(clonePrivateScope, "__dict__").update(
+                copyFields(store.__dict__, copyValue, cellMap)
+            )
+        elif copyOnWrite:
+            object.__setattr__(clonePrivateScope, "instance", store)
+            object.__setattr__(clonePrivateScope, "copyOnWrite", (cellMap, {}))
+            object.__setattr__(clonePrivateScope, "__class__", CopyOnWriteScope)
+            if shared is None:
+                # The source now shares its store as well, so it copies on its next write.
+                object.__setattr__(privateScope, "copyOnWrite", (None, {}))
+                object.__setattr__(privateScope, "__class__", CopyOnWriteScope)
+        else:
+            object.__setattr__(
+                clonePrivateScope, "instance", copyStore(store, copyValue, cellMap)
+            )
+
+        object.__getattribute__(clone, "__dict__").update(
+            copyFields(object.__getattribute__(self, "__dict__"), copyValue, cellMap)
+        )
+        return clone
+
+    def getFields(instance):
+        # The public and private variables of an instance, without the functions
+        # stored in them since those are bound to the scopes of the instance.
+        privateScope = stateOf(instance)[1].cell_contents
+        return tuple(
+            {
+                name: value
+                for name, value in object.__getattribute__(fields, "__dict__").items()
+                if name != "__pythonpp__" and not isinstance(value, types.FunctionType)
+            }
+            for fields in (instance, storeOf(privateScope))
+        )
+
+    def setFields(instance, public, private, deleted=((), ()), validate=True):
+        cells = stateOf(instance)
+        publicScope, privateScope = cells[0].cell_contents, cells[1].cell_contents
+        publicDeleted, privateDeleted = deleted
+        if (privateDeleted or not validate) and isinstance(
+            privateScope, CopyOnWriteScope
+        ):
+            detach(privateScope)
+        if validate:
+            for name, value in public.items():
+                setattr(publicScope, name, value)
+            for name, value in private.items():
+                setattr(privateScope, name, value)
+        else:
+            # Values known to be valid are stored without going through the scopes.
+            object.__getattribute__(instance, "__dict__").update(public)
+            object.__getattribute__(storeOf(privateScope), "__dict__").update(private)
+        for name in publicDeleted:
+            object.__delattr__(instance, name)
+        for name in privateDeleted:
+            delattr(storeOf(privateScope), name)
+
+    def __copy__(self):
+        return cloneInstance(self)
+
+    def __deepcopy__(self, memo):
+        return cloneInstance(self, memo=memo)
 
     cls.__init__ = __init__
+    cls.__clone__ = cloneInstance
+    cls.__copy__ = __copy__
+    cls.__deepcopy__ = __deepcopy__
+    cls.__getfields__ = getFields
+    cls.__setfields__ = setFields
+    cls.constructor = callConstructor
     cls.staticinit = __empty
 
-    __staticNamespacing = True
-    for base in cls.__bases__:
-        if hasattr(base, "namespace"):
-            base.staticinit = __empty
-    recursivelyInitNamespace(
-        Scope(None, static_public_scope), Scope(None, static_private_scope),
+    layout = __Layout(
+        templateScope("public", publicValidators)(static_public_scope),
+        templateScope("private", privateValidators)(static_private_scope),
     )
-    cls.staticinit()
-    __staticNamespacing = False
+    with __declaring:
+        # Classes can be declared while another class runs its namespace.
+        declaring = __layout, __staticNamespacing
+        __layout = layout
+        __staticNamespacing = True
+        try:
+            for theClass in namespacedClasses():
+                if theClass is not cls:
+                    theClass.staticinit = __empty
+            recursivelyInitNamespace(*layout.scopes)
+            cls.staticinit()
+        finally:
+            __layout, __staticNamespacing = declaring
 
-    def recursivelyClearStaticinits(theClass):
-        if hasattr(theClass, "staticinit"):
-            del theClass.staticinit
-        for base in theClass.__bases__:
-            recursivelyClearStaticinits(base)
+            for theClass in namespacedClasses() + [cls]:
+                if "staticinit" in theClass.__dict__:
+                    del theClass.staticinit
+
+    # The namespace has run once for the whole class; instances only bind its functions.
+    functions = layoutFunctions(layout)
+    names = {
+        name
+        for theClass in namespacedClasses()
+        for name in theClass.namespace.__code__.co_cellvars
+    }
+    localVariables = __localCells(functions, layout.scopes, names)
+    localCells = tuple([cell for cell, _ in localVariables])
+    localPaths = tuple([path for _, path in localVariables])
+    binder = lambda function: __binder(function, layout.scopes, localCells)
+    for scopeName, binders in (("public", publicBinders), ("private", privateBinders)):
+        for name, function in layout.methods[scopeName].items():
+            binders[name] = binder(function)
+    for scopeName, initializers in (
+        ("public", publicInitializers),
+        ("private", privateInitializers),
+    ):
+        for name, value in layout.variables[scopeName].items():
+            if isinstance(value, types.FunctionType):
+                initializers.append((name, binder(value)))
+            else:
+                initializers.append((name, lambda cells, value=value: value))
+    for theClass, function in layout.constructors.items():
+        constructorBinders[theClass] = binder(function)
+    for name, function in layout.specials.items():
+        setattr(cls, name, specialMethod(binder(function)))
+
+    abstract = frozenset(layout.abstract["public"] | layout.abstract["private"])
+    if interface:
+        declared = [
+            name
+            for members in (
+                layout.methods["public"],
+                layout.methods["private"],
+                layout.abstract["private"],
+                layout.variables["public"],
+                layout.variables["private"],
+                layout.constructors,
+                layout.specials,
+            )
+            for name in members
+        ]
+        if declared:
+            raise TypeError(
+                'The interface "{name}" can only declare abstract public methods, not {members}.'.format(
+                    name=cls.__qualname__,
+                    members=", ".join(
+                        '"{member}"'.format(
+                            member=getattr(member, "__qualname__", member)
+                        )
+                        for member in declared
+                    ),
+                )
+            )
+        cls.__init__ = __interfaceInit
+    elif final and abstract:
+        raise TypeError(
+            'The final class "{name}" does not implement the abstract methods {methods}.'.format(
+                name=cls.__qualname__,
+                methods=", ".join(
+                    '"{method}"'.format(method=method) for method in sorted(abstract)
+                ),
+            )
+        )
+    if final:
+        cls.__init_subclass__ = classmethod(__finalInitSubclass)
+    # Instantiating a class with abstract methods raises a TypeError in object.__new__.
+    cls.__abstractmethods__ = abstract
+    cls.__interface__ = interface
+    cls.__final__ = final
+
+    cls.__layout__ = layout
+    if checks:
+        cls.__getattribute__ = __getattribute__
+        cls.__setattr__ = __setattr__
+        return cls
 
-    recursivelyClearStaticinits(cls)
+    # Without checks, methods are bound by descriptors and variables are plain attributes.
+    cls.static = static_public_scope
+    Store.static = static_private_scope
+    for name, bind in publicBinders.items():
+        setattr(cls, name, Method(bind))
+    for name, bind in privateBinders.items():
+        setattr(Store, name, Method(bind))
+    for scopeName, target, validators in (
+        ("public", cls, publicValidators),
+        ("private", Store, privateValidators),
+    ):
+        getattribute = object.__getattribute__
+        setattribute = validatingSetattr(validators) if validators else object.__setattr__
+        if counters is not None:
+            getattribute, setattribute = countedHooks(scopeName, getattribute, setattribute)
+        # Hooks inherited from a base class declared with checks are replaced as well.
+        if target.__getattribute__ is not getattribute:
+            target.__getattribute__ = getattribute
+        if target.__setattr__ is not setattribute:
+            target.__setattr__ = setattribute
 
     return cls
@@ -0,0 +1,446 @@
+"""
+Streaming serialization of Python++ objects to binary records and JSON lines.
+Loaded on first use, see `pythonpp.serialization`.
+"""
+import base64
+import io
+import json
+import mmap
+import os
+import struct
+import types
+import typing
+
+from . import codegen
+
+__MAGIC = b"PYPP"
+__LENGTH = struct.Struct("<I")
+__FIXED = {int: "q", float: "d", bool: "?"}
+__JSON = frozenset((type(None), bool, int, float, str))
+# Containers JSON has no type for are stored as objects with a single tag.
+__TAGGED = {tuple: "__tuple__", set: "__set__", frozenset: "__frozenset__"}
+__UNTAGGED = {
+    "__tuple__": tuple,
+    "__set__": set,
+    "__frozenset__": frozenset,
+    "__bytes__": base64.b64decode,
+    "__dict__": lambda items: {key: value for key, value in items},
+}
+__schemas = {}
+
+
+def __fieldKind(fieldType):
+    """
+    Returns the encoding of a declared field and whether it accepts None.
+    """
+    optional = False
+    origin = typing.get_origin(fieldType)
+    if origin is typing.Union or origin is getattr(types, "UnionType", None):
+        arguments = [
+            argument
+            for argument in typing.get_args(fieldType)
+            if argument is not type(None)
+        ]
+        optional = len(arguments) < len(typing.get_args(fieldType))
+        fieldType = arguments[0] if len(arguments) == 1 else None
+    elif fieldType is None:
+        return "json", True
+    if fieldType in __FIXED:
+        return __FIXED[fieldType], optional
+    if fieldType is str or fieldType is bytes:
+        return fieldType.__name__, optional
+    return "json", optional
+
+
+def __jsonTree(value, name=None):
+    """
+    Returns `value` with the values JSON has no type for replaced with tagged objects,
+    e.g. `(1, 2)` with `{"__tuple__": [1, 2]}`, so `__jsonObject` loads them with their types.
+    Dicts with keys that are not strings, or with a single key that is a tag, are tagged as well.
+    `name` is the variable holding the value; the values of a dict without a name are variables themselves.
+    Values of other types, including subclasses of the types above, raise a TypeError.
+    """
+    valueType = type(value)
+    if valueType in __JSON:
+        return value
+    if valueType is list:
+        return [__jsonTree(item, name) for item in value]
+    if valueType is dict:
+        if all(type(key) is str for key in value) and not (
+            len(value) == 1 and next(iter(value)) in __UNTAGGED
+        ):
+            return {key: __jsonTree(item, name or key) for key, item in value.items()}
+        return {
+            "__dict__": [
+                [__jsonTree(key, name), __jsonTree(item, name or key)]
+                for key, item in value.items()
+            ]
+        }
+    if valueType is bytes:
+        return {"__bytes__": base64.b64encode(value).decode()}
+    if valueType in __TAGGED:
+        return {__TAGGED[valueType]: [__jsonTree(item, name) for item in value]}
+    raise TypeError(
+        'The variable "{name}" cannot be saved as JSON because it holds a "{type}" value.'.format(
+            name=name, type=valueType.__qualname__
+        )
+    )
+
+
+def __jsonObject(value):
+    # The object hook of `json.loads` undoing `__jsonTree`.
+    if len(value) == 1:
+        ((tag, items),) = value.items()
+        untag = __UNTAGGED.get(tag)
+        if untag is not None:
+            return untag(items)
+    return value
+
+
+def __encodeJSON(value, name=None):
+    return json.dumps(__jsonTree(value, name), separators=(",", ":")).encode()
+
+
+def __decodeJSON(value):
+    return json.loads(value, object_hook=__jsonObject)
+
+
+def __jsonValue(kind, value):
+    return base64.b64encode(value).decode() if kind == "bytes" and value is not None else value
+
+
+def __pythonValue(kind, value):
+    return base64.b64decode(value) if kind == "bytes" and value is not None else value
+
+
+class Schema:
+    """
+    The layout of the records of a Python++ class, derived from its typed fields.
+    `int`, `float` and `bool` fields are stored in a fixed size part, `str` and `bytes` fields
+    are length-prefixed, and fields of other types are stored as JSON.
+    Optional fields are marked in a bitmap when they are None.
+    The variables of an instance that are not typed fields are stored as JSON after the fields.
+    Tuples, sets and bytes stored as JSON keep their types, see `__jsonTree`.
+    """
+
+    def __init__(self, cls, fields):
+        self.cls = cls
+        self.fields = []
+        self.description = []
+        self.names = (set(), set())
+        fixedFormat = ""
+        optional = 0
+        for scopeIndex, scopeName in enumerate(("public", "private")):
+            for name, fieldType in fields[scopeName].items():
+                kind, nullable = globals()["__fieldKind"](fieldType)
+                bit = 0
+                if nullable:
+                    bit = 1 << optional
+                    optional += 1
+                if len(kind) == 1:
+                    fixedFormat += kind
+                self.fields.append((scopeIndex, name, kind, bit))
+                self.names[scopeIndex].add(name)
+                self.description.append([scopeName, name, kind, bool(bit)])
+        # Values decoded from binary records have the declared types unless they are stored as JSON.
+        self.validate = any(kind == "json" for _, _, kind, _ in self.fields)
+        self.bitmapSize = (optional + 7) // 8
+        self.fixed = struct.Struct("<{size}s{fixed}".format(size=self.bitmapSize, fixed=fixedFormat))
+        self.header = json.dumps(self.description).encode()
+        self.length = globals()["__LENGTH"]
+        self.encodeJSON = globals()["__encodeJSON"]
+        self.decodeJSON = globals()["__decodeJSON"]
+        self.jsonTree = globals()["__jsonTree"]
+        self.jsonValue = globals()["__jsonValue"]
+        self.pythonValue = globals()["__pythonValue"]
+
+    def values(self, instance):
+        """
+        Returns the values of the typed fields of an instance and its other variables.
+        """
+        scopes = self.cls.__getfields__(instance)
+        try:
+            values = [scopes[scopeIndex][name] for scopeIndex, name, _, _ in self.fields]
+        except KeyError as error:
+            raise ValueError(
+                'The field "{name}" of a "{cls}" object is not set.'.format(
+                    name=error.args[0], cls=self.cls.__qualname__
+                )
+            ) from None
+        others = tuple(
+            {name: value for name, value in scope.items() if name not in names}
+            for scope, names in zip(scopes, self.names)
+        )
+        return values, others
+
+    def instance(self, values, others, validate):
+        instance = object.__new__(self.cls)
+        scopes = tuple(dict(scope) for scope in others)
+        for (scopeIndex, name, _, _), value in zip(self.fields, values):
+            scopes[scopeIndex][name] = value
+        self.cls.__setfields__(instance, *scopes, validate=validate)
+        return instance
+
+    def encode(self, instance):
+        """
+        Returns the binary record of an instance, with its length prefix.
+        """
+        nulls = 0
+        fixed = []
+        variable = []
+        values, others = self.values(instance)
+        for (_, name, kind, bit), value in zip(self.fields, values):
+            if value is None and bit:
+                nulls |= bit
+                value = {"q": 0, "d": 0.0, "?": False}.get(kind, b"")
+            elif kind == "str":
+                value = value.encode()
+            elif kind == "json":
+                value = self.encodeJSON(value, name)
+            if len(kind) == 1:
+                fixed.append(value)
+            else:
+                variable.append(self.length.pack(len(value)))
+                variable.append(value)
+        # The other variables end the record; instances without any store nothing.
+        others = self.encodeJSON(others) if any(others) else b""
+        variable.append(self.length.pack(len(others)))
+        variable.append(others)
+        try:
+            payload = self.fixed.pack(nulls.to_bytes(self.bitmapSize, "little"), *fixed)
+        except struct.error:
+            self.checkRange(values)
+            raise
+        payload += b"".join(variable)
+        return self.length.pack(len(payload)) + payload
+
+    def checkRange(self, values):
+        # Integers are stored in 64 bits.
+        for (_, name, kind, _), value in zip(self.fields, values):
+            if kind == "q" and isinstance(value, int) and not -(2 ** 63) <= value < 2 ** 63:
+                raise ValueError(
+                    'The field "{name}" of a "{cls}" object holds {value}, which does not fit in 64 bits.'.format(
+                        name=name, cls=self.cls.__qualname__, value=value
+                    )
+                )
+
+    def decode(self, buffer, offset):
+        """
+        Decodes the record starting at `offset` in `buffer`.
+        Returns the instance and the offset of the next record.
+        """
+        length = self.length
+        (size,) = length.unpack_from(buffer, offset)
+        offset += length.size
+        end = offset + size
+        fixed = self.fixed.unpack_from(buffer, offset)
+        nulls = int.from_bytes(fixed[0], "little")
+        fixedValues = iter(fixed[1:])
+        offset += self.fixed.size
+        values = []
+        for _, _, kind, bit in self.fields:
+            if len(kind) == 1:
+                value = next(fixedValues)
+            else:
+                (valueSize,) = length.unpack_from(buffer, offset)
+                offset += length.size
+                value = bytes(buffer[offset : offset + valueSize])
+                offset += valueSize
+                if kind == "str":
+                    value = value.decode()
+                elif kind == "json" and not nulls & bit:
+                    value = self.decodeJSON(value)
+            values.append(None if nulls & bit else value)
+        (othersSize,) = length.unpack_from(buffer, offset)
+        offset += length.size
+        others = ({}, {})
+        if othersSize:
+            others = self.decodeJSON(bytes(buffer[offset : offset + othersSize]))
+        return self.instance(values, others, self.validate), end
+
+    def toJSON(self, instance):
+        """
+        Returns the JSON line of an instance, without the line break.
+        """
+        values, others = self.values(instance)
+        scopes = (dict(others[0]), dict(others[1]))
+        for (scopeIndex, name, kind, _), value in zip(self.fields, values):
+            scopes[scopeIndex][name] = self.jsonValue(kind, value)
+        record = {"public": self.jsonTree(scopes[0]), "private": self.jsonTree(scopes[1])}
+        return json.dumps(record, separators=(",", ":"))
+
+    def fromJSON(self, line):
+        """
+        Decodes a JSON line into an instance.
+        """
+        record = self.decodeJSON(line)
+        scopes = (record["public"], record["private"])
+        return self.instance(
+            [
+                self.pythonValue(kind, scopes[scopeIndex].get(name))
+                for scopeIndex, name, kind, _ in self.fields
+            ],
+            [
+                {name: value for name, value in scope.items() if name not in names}
+                for scope, names in zip(scopes, self.names)
+            ],
+            True,
+        )
+
+
+def schemaOf(cls):
+    """
+    Returns the serialization schema of a Python++ class, derived from its typed fields.
+
+    ### Example
+    ```
+    @PythonPP
+    class MyClass:
+        def namespace(public, private):
+            public.name: str
+            private.level: int
+
+    schemaOf(MyClass).description
+    # > [['public', 'name', 'str', False], ['private', 'level', 'q', False]]
+    ```
+    """
+    schema = __schemas.get(cls)
+    if schema is None:
+        schema = __schemas[cls] = Schema(cls, codegen.declaredFields(cls))
+    return schema
+
+
+def encodeRecords(cls, objects):
+    """
+    Encodes Python++ objects to binary records, one `bytes` chunk at a time.
+    The first chunk is a header describing the schema of the records.
+
+    ### Parameters
+    `cls`: The Python++ class of the objects.
+
+    `objects`: An iterable of objects, which can be a generator.
+    """
+    schema = schemaOf(cls)
+    yield __MAGIC + __LENGTH.pack(len(schema.header)) + schema.header
+    for instance in objects:
+        yield schema.encode(instance)
+
+
+def decodeRecords(cls, buffer):
+    """
+    Decodes the binary records in a bytes-like object one object at a time.
+
+    ### Parameters
+    `cls`: The Python++ class of the objects.
+
+    `buffer`: The records written by `encodeRecords` or `dumpRecords`.
+    """
+    schema = schemaOf(cls)
+    if bytes(buffer[: len(__MAGIC)]) != __MAGIC:
+        raise ValueError("The buffer does not contain Python++ records.")
+    offset = len(__MAGIC)
+    (size,) = __LENGTH.unpack_from(buffer, offset)
+    offset += __LENGTH.size
+    if json.loads(bytes(buffer[offset : offset + size])) != schema.description:
+        raise ValueError(
+            'The records do not match the schema of "{name}".'.format(
+                name=cls.__qualname__
+            )
+        )
+    offset += size
+    end = len(buffer)
+    while offset < end:
+        instance, offset = schema.decode(buffer, offset)
+        yield instance
+
+
+def dumpRecords(cls, objects, file):
+    """
+    Writes Python++ objects to a binary file as length-prefixed records.
+    Returns the number of objects written.
+
+    ### Example
+    ```
+    with open("objects.bin", "wb") as file:
+        dumpRecords(MyClass, (MyClass(index) for index in range(1000000)), file)
+    ```
+    """
+    count = 0
+    # The first record is the header, so the index of the last record is the number of objects.
+    for count, record in enumerate(encodeRecords(cls, objects)):
+        file.write(record)
+    return count
+
+
+def __mapped(source, binary):
+    # Yields the contents of a path or file, memory-mapped when possible.
+    owned = isinstance(source, (str, bytes, os.PathLike))
+    file = open(source, "rb" if binary or owned else "r") if owned else source
+    try:
+        try:
+            fileno = file.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            fileno = None
+        if fileno is None or os.fstat(fileno).st_size == 0:
+            yield None, file
+            return
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped, file
+        finally:
+            mapped.close()
+    finally:
+        if owned:
+            file.close()
+
+
+def loadRecords(cls, source):
+    """
+    Reads Python++ objects from binary records one object at a time.
+    Files are memory-mapped, so they are never read into memory as a whole.
+
+    ### Example
+    ```
+    for obj in loadRecords(MyClass, "objects.bin"):
+        pass # obj is a MyClass object
+    ```
+
+    ### Parameters
+    `source`: A path, or a binary file opened for reading.
+    """
+    for mapped, file in __mapped(source, True):
+        yield from decodeRecords(cls, file.read() if mapped is None else mapped)
+
+
+def dumpJSONLines(cls, objects, file):
+    """
+    Writes Python++ objects to a text file as JSON lines.
+    Returns the number of objects written.
+
+    ### Example
+    ```
+    with open("objects.jsonl", "w") as file:
+        dumpJSONLines(MyClass, objects, file)
+    ```
+    """
+    schema = schemaOf(cls)
+    count = 0
+    for count, instance in enumerate(objects, 1):
+        file.write(schema.toJSON(instance))
+        file.write("\n")
+    return count
+
+
+def loadJSONLines(cls, source):
+    """
+    Reads Python++ objects from JSON lines one object at a time.
+    Files are memory-mapped, so they are never read into memory as a whole.
+
+    ### Parameters
+    `source`: A path, or a file opened for reading.
+    """
+    schema = schemaOf(cls)
+    for mapped, file in __mapped(source, False):
+        for line in iter(mapped.readline, b"") if mapped is not None else file:
+            if line.strip():
+                yield schema.fromJSON(line)
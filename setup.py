@@ -25,6 +25,6 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.0",
+    python_requires=">=3.8",
     install_requires=requirements,
 )